@@ -2,12 +2,32 @@ from langchain_openai import ChatOpenAI
 from graph.state import AgentState, show_agent_reasoning
 from tools.api import get_financial_metrics, get_market_cap, search_line_items
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompt_values import ChatPromptValue
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from utils.progress import progress
 from utils.llm import call_llm
+from utils.persona_batch import generate_persona_signals
+
+
+LINE_ITEM_REQUEST = {
+    "line_items": [
+        "revenue",
+        "operating_margin",
+        "debt_to_equity",
+        "free_cash_flow",
+        "total_assets",
+        "total_liabilities",
+        "dividends_and_other_cash_distributions",
+        "outstanding_shares",
+        # Optional: intangible_assets if available
+        # "intangible_assets"
+    ],
+    "period": "annual",
+    "limit": 5,
+}
 
 
 class BillAckmanSignal(BaseModel):
@@ -35,24 +55,7 @@ def bill_ackman_agent(state: AgentState):
         
         progress.update_status("bill_ackman_agent", ticker, "Gathering financial line items")
         # Request multiple periods of data (annual or TTM) for a more robust long-term view.
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "operating_margin",
-                "debt_to_equity",
-                "free_cash_flow",
-                "total_assets",
-                "total_liabilities",
-                "dividends_and_other_cash_distributions",
-                "outstanding_shares",
-                # Optional: intangible_assets if available
-                # "intangible_assets"
-            ],
-            end_date,
-            period="annual",
-            limit=5
-        )
+        financial_line_items = search_line_items(ticker, end_date=end_date, **LINE_ITEM_REQUEST)
         
         progress.update_status("bill_ackman_agent", ticker, "Getting market cap")
         market_cap = get_market_cap(ticker, end_date)
@@ -96,20 +99,23 @@ def bill_ackman_agent(state: AgentState):
             "valuation_analysis": valuation_analysis
         }
         
-        progress.update_status("bill_ackman_agent", ticker, "Generating Bill Ackman analysis")
-        ackman_output = generate_ackman_output(
-            ticker=ticker, 
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-        
+
+    outputs = generate_persona_signals(
+        agent_name="bill_ackman_agent",
+        analysis_data=analysis_data,
+        build_prompt=ackman_prompt,
+        generate_one=generate_ackman_output,
+        signal_model=BillAckmanSignal,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+        status="Generating Bill Ackman analysis",
+    )
+    for ticker, ackman_output in outputs.items():
         ackman_analysis[ticker] = {
             "signal": ackman_output.signal,
             "confidence": ackman_output.confidence,
             "reasoning": ackman_output.reasoning
         }
-        
         progress.update_status("bill_ackman_agent", ticker, "Done")
     
     # Wrap results in a single message for the chain
@@ -390,17 +396,8 @@ def analyze_valuation(financial_line_items: list, market_cap: float) -> dict:
     }
 
 
-def generate_ackman_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> BillAckmanSignal:
-    """
-    Generates investment decisions in the style of Bill Ackman.
-    Includes more explicit references to brand strength, activism potential, 
-    catalysts, and management changes in the system prompt.
-    """
+def ackman_prompt(ticker: str, analysis_data: dict[str, any]) -> ChatPromptValue:
+    """Build the Ackman prompt for one ticker's analysis."""
     template = ChatPromptTemplate.from_messages([
         (
             "system",
@@ -441,11 +438,25 @@ def generate_ackman_output(
         )
     ])
 
-    prompt = template.invoke({
-        "analysis_data": json.dumps(analysis_data, indent=2),
+    return template.invoke({
+        "analysis_data": json.dumps(analysis_data, separators=(",", ":")),
         "ticker": ticker
     })
 
+
+def generate_ackman_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> BillAckmanSignal:
+    """
+    Generates investment decisions in the style of Bill Ackman.
+    Includes more explicit references to brand strength, activism potential, 
+    catalysts, and management changes in the system prompt.
+    """
+    prompt = ackman_prompt(ticker, analysis_data)
+
     def create_default_bill_ackman_signal():
         return BillAckmanSignal(
             signal="neutral",
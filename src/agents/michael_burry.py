@@ -7,6 +7,7 @@ from typing_extensions import Literal
 from graph.state import AgentState, show_agent_reasoning
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompt_values import ChatPromptValue
 from pydantic import BaseModel
 
 from tools.api import (
@@ -17,6 +18,7 @@ from tools.api import (
     search_line_items,
 )
 from utils.llm import call_llm
+from utils.persona_batch import generate_persona_signals
 from utils.progress import progress
 
 __all__ = [
@@ -24,6 +26,22 @@ __all__ = [
     "michael_burry_agent",
 ]
 
+LINE_ITEM_REQUEST = {
+    "line_items": [
+        "free_cash_flow",
+        "net_income",
+        "total_debt",
+        "cash_and_equivalents",
+        "total_assets",
+        "total_liabilities",
+        "outstanding_shares",
+        "issuance_or_purchase_of_equity_shares",
+    ],
+    "period": "ttm",
+    "limit": 10,
+}
+
+
 ###############################################################################
 # Pydantic output model
 ###############################################################################
@@ -63,20 +81,7 @@ def michael_burry_agent(state: AgentState):  # noqa: C901  (complexity is fine h
         metrics = get_financial_metrics(ticker, end_date, period="ttm", limit=5)
 
         progress.update_status("michael_burry_agent", ticker, "Fetching line items")
-        line_items = search_line_items(
-            ticker,
-            [
-                "free_cash_flow",
-                "net_income",
-                "total_debt",
-                "cash_and_equivalents",
-                "total_assets",
-                "total_liabilities",
-                "outstanding_shares",
-                "issuance_or_purchase_of_equity_shares",
-            ],
-            end_date,
-        )
+        line_items = search_line_items(ticker, end_date=end_date, **LINE_ITEM_REQUEST)
 
         progress.update_status("michael_burry_agent", ticker, "Fetching insider trades")
         insider_trades = get_insider_trades(ticker, end_date=end_date, start_date=start_date)
@@ -139,20 +144,22 @@ def michael_burry_agent(state: AgentState):  # noqa: C901  (complexity is fine h
             "market_cap": market_cap,
         }
 
-        progress.update_status("michael_burry_agent", ticker, "Generating LLM output")
-        burry_output = _generate_burry_output(
-            ticker=ticker,
-            analysis_data=analysis_data,
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-
+    outputs = generate_persona_signals(
+        agent_name="michael_burry_agent",
+        analysis_data=analysis_data,
+        build_prompt=_burry_prompt,
+        generate_one=_generate_burry_output,
+        signal_model=MichaelBurrySignal,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+        status="Generating LLM output",
+    )
+    for ticker, burry_output in outputs.items():
         burry_analysis[ticker] = {
             "signal": burry_output.signal,
             "confidence": burry_output.confidence,
             "reasoning": burry_output.reasoning,
         }
-
         progress.update_status("michael_burry_agent", ticker, "Done")
 
     # ----------------------------------------------------------------------
@@ -323,15 +330,8 @@ def _analyze_contrarian_sentiment(news):
 # LLM generation
 ###############################################################################
 
-def _generate_burry_output(
-    ticker: str,
-    analysis_data: dict,
-    *,
-    model_name: str,
-    model_provider: str,
-) -> MichaelBurrySignal:
-    """Call the LLM to craft the final trading signal in Burry's voice."""
-
+def _burry_prompt(ticker: str, analysis_data: dict[str, any]) -> ChatPromptValue:
+    """Build the Burry prompt for one ticker's analysis."""
     template = ChatPromptTemplate.from_messages(
         [
             (
@@ -372,7 +372,19 @@ def _generate_burry_output(
         ]
     )
 
-    prompt = template.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "ticker": ticker})
+    return template.invoke({"analysis_data": json.dumps(analysis_data, separators=(",", ":")), "ticker": ticker})
+
+
+def _generate_burry_output(
+    ticker: str,
+    analysis_data: dict,
+    *,
+    model_name: str,
+    model_provider: str,
+) -> MichaelBurrySignal:
+    """Call the LLM to craft the final trading signal in Burry's voice."""
+
+    prompt = _burry_prompt(ticker, analysis_data)
 
     # Default fallback signal in case parsing fails
     def create_default_michael_burry_signal():
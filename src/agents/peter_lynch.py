@@ -8,15 +8,37 @@ from tools.api import (
     get_prices,
 )
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.prompt_values import ChatPromptValue
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel
 import json
 from typing_extensions import Literal
 from utils.progress import progress
 from utils.llm import call_llm
+from utils.persona_batch import generate_persona_signals
 import statistics
 
 
+LINE_ITEM_REQUEST = {
+    "line_items": [
+        "revenue",
+        "earnings_per_share",
+        "net_income",
+        "operating_income",
+        "gross_margin",
+        "operating_margin",
+        "free_cash_flow",
+        "capital_expenditure",
+        "cash_and_equivalents",
+        "total_debt",
+        "shareholders_equity",
+        "outstanding_shares",
+    ],
+    "period": "annual",
+    "limit": 5,
+}
+
+
 class PeterLynchSignal(BaseModel):
     """
     Container for the Peter Lynch-style output signal.
@@ -55,26 +77,7 @@ def peter_lynch_agent(state: AgentState):
 
         progress.update_status("peter_lynch_agent", ticker, "Gathering financial line items")
         # Relevant line items for Peter Lynch's approach
-        financial_line_items = search_line_items(
-            ticker,
-            [
-                "revenue",
-                "earnings_per_share",
-                "net_income",
-                "operating_income",
-                "gross_margin",
-                "operating_margin",
-                "free_cash_flow",
-                "capital_expenditure",
-                "cash_and_equivalents",
-                "total_debt",
-                "shareholders_equity",
-                "outstanding_shares",
-            ],
-            end_date,
-            period="annual",
-            limit=5,
-        )
+        financial_line_items = search_line_items(ticker, end_date=end_date, **LINE_ITEM_REQUEST)
 
         progress.update_status("peter_lynch_agent", ticker, "Getting market cap")
         market_cap = get_market_cap(ticker, end_date)
@@ -136,20 +139,22 @@ def peter_lynch_agent(state: AgentState):
             "insider_activity": insider_activity,
         }
 
-        progress.update_status("peter_lynch_agent", ticker, "Generating Peter Lynch analysis")
-        lynch_output = generate_lynch_output(
-            ticker=ticker,
-            analysis_data=analysis_data[ticker],
-            model_name=state["metadata"]["model_name"],
-            model_provider=state["metadata"]["model_provider"],
-        )
-
+    outputs = generate_persona_signals(
+        agent_name="peter_lynch_agent",
+        analysis_data=analysis_data,
+        build_prompt=lynch_prompt,
+        generate_one=generate_lynch_output,
+        signal_model=PeterLynchSignal,
+        model_name=state["metadata"]["model_name"],
+        model_provider=state["metadata"]["model_provider"],
+        status="Generating Peter Lynch analysis",
+    )
+    for ticker, lynch_output in outputs.items():
         lynch_analysis[ticker] = {
             "signal": lynch_output.signal,
             "confidence": lynch_output.confidence,
             "reasoning": lynch_output.reasoning,
         }
-
         progress.update_status("peter_lynch_agent", ticker, "Done")
 
     # Wrap up results
@@ -437,15 +442,8 @@ def analyze_insider_activity(insider_trades: list) -> dict:
     return {"score": score, "details": "; ".join(details)}
 
 
-def generate_lynch_output(
-    ticker: str,
-    analysis_data: dict[str, any],
-    model_name: str,
-    model_provider: str,
-) -> PeterLynchSignal:
-    """
-    Generates a final JSON signal in Peter Lynch's voice & style.
-    """
+def lynch_prompt(ticker: str, analysis_data: dict[str, any]) -> ChatPromptValue:
+    """Build the Peter Lynch prompt for one ticker's analysis."""
     template = ChatPromptTemplate.from_messages(
         [
             (
@@ -488,7 +486,19 @@ def generate_lynch_output(
         ]
     )
 
-    prompt = template.invoke({"analysis_data": json.dumps(analysis_data, indent=2), "ticker": ticker})
+    return template.invoke({"analysis_data": json.dumps(analysis_data, separators=(",", ":")), "ticker": ticker})
+
+
+def generate_lynch_output(
+    ticker: str,
+    analysis_data: dict[str, any],
+    model_name: str,
+    model_provider: str,
+) -> PeterLynchSignal:
+    """
+    Generates a final JSON signal in Peter Lynch's voice & style.
+    """
+    prompt = lynch_prompt(ticker, analysis_data)
 
     def create_default_signal():
         return PeterLynchSignal(
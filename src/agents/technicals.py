@@ -9,7 +9,7 @@ from graph.state import AgentState, show_agent_reasoning
 
 import json
 
-from tools.api import get_prices, prices_to_df
+from tools.api import get_price_data
 from utils.progress import progress
 
 # Helper function to safely get the last value or NaN
@@ -48,14 +48,14 @@ def technical_analyst_agent(state: AgentState):
     for ticker in tickers:
         progress.update_status("technical_analyst_agent", ticker, "Analyzing price data")
 
-        # Get the historical price data
-        prices = get_prices(
+        # Get the historical price data as a writable DataFrame copied from the columnar cache
+        prices_df = get_price_data(
             ticker=ticker,
             start_date=start_date,
             end_date=end_date,
         )
 
-        if not prices:
+        if prices_df.empty:
             progress.update_status("technical_analyst_agent", ticker, "Failed: No price data found")
             # Assign default neutral/NaN result if no data
             technical_analysis[ticker] = {
@@ -71,26 +71,6 @@ def technical_analyst_agent(state: AgentState):
             }
             continue # Skip to next ticker
 
-        # Convert prices to a DataFrame
-        prices_df = prices_to_df(prices)
-
-        # Check if DataFrame is empty after conversion (e.g., API returned empty list)
-        if prices_df.empty:
-            progress.update_status("technical_analyst_agent", ticker, "Failed: Empty DataFrame after conversion")
-            # Assign default neutral/NaN result
-            technical_analysis[ticker] = {
-                "signal": "neutral",
-                "confidence": 50,
-                "strategy_signals": {
-                    "trend_following": {"signal": "neutral", "confidence": 50, "metrics": {}},
-                    "mean_reversion": {"signal": "neutral", "confidence": 50, "metrics": {}},
-                    "momentum": {"signal": "neutral", "confidence": 50, "metrics": {}},
-                    "volatility": {"signal": "neutral", "confidence": 50, "metrics": {}},
-                    "statistical_arbitrage": {"signal": "neutral", "confidence": 50, "metrics": {}},
-                }
-            }
-            continue # Skip to next ticker
-
 
         progress.update_status("technical_analyst_agent", ticker, "Calculating trend signals")
         trend_signals = calculate_trend_signals(prices_df)
@@ -12,15 +12,10 @@ import numpy as np
 import itertools
 
 from llm.models import LLM_ORDER, get_model_info, get_default_model, ModelProvider
-from utils.analysts import ANALYST_ORDER
+from utils.analysts import ANALYST_CONFIG, ANALYST_ORDER, get_data_plan
 from main import run_hedge_fund
-from tools.api import (
-    get_company_news,
-    get_price_data,
-    get_prices,
-    get_financial_metrics,
-    get_insider_trades,
-)
+from tools.api import get_price_data
+from tools.async_api import prefetch_plan
 from utils.display import print_backtest_results, format_backtest_row
 from typing_extensions import Callable
 import io
@@ -44,7 +39,7 @@ class Backtester:
         initial_margin_requirement: float = 0.0,
     ):
         """
-        :param agent: The trading agent (Callable).
+        :param agent: The trading agent (Callable), called with prefetch=False since prefetch_data covers the whole period.
         :param tickers: List of tickers to backtest.
         :param start_date: Start date string (YYYY-MM-DD).
         :param end_date: End date string (YYYY-MM-DD).
@@ -341,23 +336,15 @@ class Backtester:
         """Pre-fetch all data needed for the backtest period."""
         print("\nPre-fetching data for the entire backtest period...")
 
-        # Convert end_date string to datetime, fetch up to 1 year before
-        end_date_dt = datetime.strptime(self.end_date, "%Y-%m-%d")
-        start_date_dt = end_date_dt - relativedelta(years=1)
-        start_date_str = start_date_dt.strftime("%Y-%m-%d")
+        # The agents run on every business day with a 30 day lookback, so plan for end dates
+        # from the first day of the backtest to the last; an empty roster runs every analyst
+        lookback_start = (datetime.strptime(self.start_date, "%Y-%m-%d") - timedelta(days=30)).strftime("%Y-%m-%d")
+        plan = get_data_plan(self.selected_analysts or list(ANALYST_CONFIG), lookback_start, self.end_date, first_end_date=self.start_date)
 
-        for ticker in self.tickers:
-            # Fetch price data for the entire period, plus 1 year
-            get_prices(ticker, start_date_str, self.end_date)
-
-            # Fetch financial metrics
-            get_financial_metrics(ticker, self.end_date, limit=10)
-
-            # Fetch insider trades
-            get_insider_trades(ticker, self.end_date, start_date=self.start_date, limit=1000)
-
-            # Fetch company news
-            get_company_news(ticker, self.end_date, start_date=self.start_date, limit=1000)
+        # Fetch the union of the roster's data for all tickers concurrently into the shared cache
+        errors = prefetch_plan(self.tickers, plan)
+        for (ticker, label), error in errors.items():
+            print(f"Warning: Failed to pre-fetch {label} for {ticker}: {error}")
 
         print("Data pre-fetch complete.")
 
@@ -442,7 +429,8 @@ class Backtester:
                 model_name=self.model_name,
                 model_provider=self.model_provider,
                 selected_analysts=self.selected_analysts,
-                show_reasoning=False
+                show_reasoning=False,
+                prefetch=False,
             )
             # decisions = output["decisions"]
             # analyst_signals = output["analyst_signals"]
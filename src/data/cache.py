@@ -1,66 +1,335 @@
+import os
+import threading
+from datetime import date, timedelta
+from functools import partial
+
+from data.dated_rows import DatedRows
+from data.disk_store import DiskStore
+from data.lru import LRUStore
+from data.price_store import PriceSeries
+
+
+def _next_day(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+def _previous_day(day: str) -> str:
+    return (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+
+
+def add_interval(intervals: list[list[str]], start_date: str, end_date: str) -> list[list[str]]:
+    """Add an inclusive [start_date, end_date] interval, merging overlapping or adjacent ones."""
+    merged = []
+    for interval_start, interval_end in sorted(intervals + [[start_date, end_date]]):
+        if merged and interval_start <= _next_day(merged[-1][1]):
+            merged[-1][1] = max(merged[-1][1], interval_end)
+        else:
+            merged.append([interval_start, interval_end])
+    return merged
+
+
+def missing_intervals(intervals: list[list[str]], start_date: str, end_date: str) -> list[tuple[str, str]]:
+    """Return the inclusive sub-ranges of [start_date, end_date] not covered by the sorted intervals."""
+    if start_date > end_date:
+        return []
+    gaps = []
+    cursor = start_date
+    for interval_start, interval_end in intervals:
+        if interval_end < cursor:
+            continue
+        if interval_start > end_date:
+            break
+        if interval_start > cursor:
+            gaps.append((cursor, _previous_day(interval_start)))
+        cursor = _next_day(interval_end)
+        if cursor > end_date:
+            return gaps
+    gaps.append((cursor, end_date))
+    return gaps
+
+
+def complete_report_periods(fetch: dict, report_periods, end_date: str, limit: int) -> list[str] | None:
+    """Newest-first report periods on or before end_date that an earlier fetch proves complete.
+
+    A fetch records its `end_date` and `complete_from`, the oldest report period it
+    returned; every report in between was returned. An empty `complete_from` means the
+    fetch came back short, so there are no older reports at all. Returns None when
+    fewer than `limit` reports are known complete.
+    """
+    covered = sorted((rp for rp in report_periods if fetch["complete_from"] <= rp <= end_date), reverse=True)
+    if len(covered) >= limit or not fetch["complete_from"]:
+        return covered[:limit]
+    return None
+
+
+def new_fetch_record(end_date: str, limit: int, data: list[dict]) -> dict:
+    """Describe which report periods a fetch of up to `limit` reports ending at end_date proved complete."""
+    # A short page means there are no older reports, so everything up to end_date is known
+    complete_from = "" if len(data) < limit else min(row["report_period"] for row in data)
+    return {"end_date": end_date, "complete_from": complete_from}
+
+
+# Share of the in-memory budget given to each data type. Price coverage and market caps are
+# tiny and derived, so they are unbudgeted but dropped together with the data they describe.
+MEMORY_BUDGET_SHARES = {
+    "prices": 0.30,
+    "financial_metrics": 0.10,
+    "line_items": 0.10,
+    "insider_trades": 0.25,
+    "company_news": 0.25,
+}
+
+_MISSING = object()
+
+
+def _insider_trade_date(trade: dict) -> str:
+    return trade.get("transaction_date") or trade["filing_date"]
+
+
+def insider_trade_key(trade: dict) -> tuple:
+    """Natural key identifying an insider trade."""
+    # The same insider can file several transactions on one day, so the filing date alone is not unique
+    return (trade["filing_date"], trade.get("name"), trade.get("transaction_date"), trade.get("transaction_shares"))
+
+
+def _news_date(news: dict) -> str:
+    return news["date"]
+
+
+def news_key(news: dict) -> str:
+    """Natural key identifying a news article."""
+    return news["url"]
+
+
 class Cache:
-    """In-memory cache for API responses."""
+    """In-memory cache for API responses, optionally backed by a persistent on-disk store.
+
+    Each data type is held in an LRUStore with its own share of a memory budget, so a
+    long-lived process (e.g. the Streamlit server) stays bounded; evicted entries are
+    reloaded from the persistent store or refetched on demand.
+
+    The persistent store holds one blob per ticker and data type, so adding insider
+    trades or news to a ticker rewrites its whole cached history on disk.
+    """
+
+    def __init__(self, store: DiskStore | None = None, memory_budget_bytes: int | None = None):
+        self._prices_cache = LRUStore(on_evict=self._on_prices_evicted)
+        self._price_coverage_cache = LRUStore()
+        # Metrics are keyed by "ticker|period"
+        self._financial_metrics_cache = LRUStore(on_evict=lambda key: self._drop_market_caps(key.split("|")[0]))
+        self._line_items_cache = LRUStore()
+        self._insider_trades_cache = LRUStore()
+        self._company_news_cache = LRUStore()
+        # ticker -> {(end_date, max_metrics_age_days): market cap}; in memory only, derived from the caches above
+        self._market_cap_cache = LRUStore()
+
+        # Guards read-modify-write cycles when fetchers run on several threads
+        self._lock = threading.RLock()
+
+        # The persistent store and memory budget are resolved lazily so that settings
+        # loaded from .env after this module is imported are still honoured
+        self._store = store
+        self._memory_budget_bytes = memory_budget_bytes
+        self._configured = False
+
+    def _memory_stores(self) -> dict[str, LRUStore]:
+        return {
+            "prices": self._prices_cache,
+            "price_coverage": self._price_coverage_cache,
+            "financial_metrics": self._financial_metrics_cache,
+            "line_items": self._line_items_cache,
+            "insider_trades": self._insider_trades_cache,
+            "company_news": self._company_news_cache,
+            "market_cap": self._market_cap_cache,
+        }
 
-    def __init__(self):
-        self._prices_cache: dict[str, list[dict[str, any]]] = {}
-        self._financial_metrics_cache: dict[str, list[dict[str, any]]] = {}
-        self._line_items_cache: dict[str, list[dict[str, any]]] = {}
-        self._insider_trades_cache: dict[str, list[dict[str, any]]] = {}
-        self._company_news_cache: dict[str, list[dict[str, any]]] = {}
+    def _configure(self):
+        """Apply environment settings on first use. Caller holds the lock."""
+        if self._configured:
+            return
+        if self._store is None:
+            self._store = DiskStore.from_env()
+        if self._memory_budget_bytes is None:
+            memory_mb = float(os.environ.get("FINANCIAL_DATA_CACHE_MEMORY_MB", "1024"))
+            self._memory_budget_bytes = int(memory_mb * 1024 * 1024) if memory_mb > 0 else None
+        if self._memory_budget_bytes is not None:
+            stores = self._memory_stores()
+            for kind, share in MEMORY_BUDGET_SHARES.items():
+                stores[kind].budget_bytes = int(self._memory_budget_bytes * share)
+        self._configured = True
 
-    def _merge_data(self, existing: list[dict] | None, new_data: list[dict], key_field: str) -> list[dict]:
-        """Merge existing and new data, avoiding duplicates based on a key field."""
-        if not existing:
-            return new_data
+    def _get_store(self) -> DiskStore | None:
+        """Get the persistent store, configuring it from the environment on first use."""
+        with self._lock:
+            self._configure()
+            return self._store
 
-        # Create a set of existing keys for O(1) lookup
-        existing_keys = {item[key_field] for item in existing}
+    def _on_prices_evicted(self, ticker: str):
+        self._price_coverage_cache.pop(ticker)
+        self._drop_market_caps(ticker)
 
-        # Only add items that don't exist yet
-        merged = existing.copy()
-        merged.extend([item for item in new_data if item[key_field] not in existing_keys])
-        return merged
+    def _drop_market_caps(self, ticker: str):
+        self._market_cap_cache.pop(ticker)
 
-    def get_prices(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached price data if available."""
-        return self._prices_cache.get(ticker)
+    def _load(self, memory: LRUStore, kind: str, ticker: str, decode=None) -> any:
+        """Read through from memory to the persistent store, decoding stored payloads with `decode` if given."""
+        with self._lock:
+            data = memory.get(ticker, _MISSING)
+            if data is not _MISSING:
+                return data
+            store = self._get_store()
+            if store is None:
+                return None
+            data = store.load(kind, ticker)
+            if data is not None:
+                memory[ticker] = data = decode(data) if decode else data
+            return data
 
-    def set_prices(self, ticker: str, data: list[dict[str, any]]):
-        """Append new price data to cache."""
-        self._prices_cache[ticker] = self._merge_data(self._prices_cache.get(ticker), data, key_field="time")
+    def _save(self, memory: LRUStore, kind: str, ticker: str, data: any, encode=None):
+        """Write to memory and through to the persistent store, encoding with `encode` if given."""
+        with self._lock:
+            self._configure()
+            memory[ticker] = data
+            if self._store:
+                self._store.save(kind, ticker, encode(data) if encode else data)
 
-    def get_financial_metrics(self, ticker: str) -> list[dict[str, any]]:
-        """Get cached financial metrics if available."""
-        return self._financial_metrics_cache.get(ticker)
+    def stats(self) -> dict[str, dict[str, int | None]]:
+        """Entries, estimated bytes, budget, hits, misses and evictions per data type, plus totals."""
+        with self._lock:
+            self._configure()
+            stats = {kind: store.stats() for kind, store in self._memory_stores().items()}
+        stats["total"] = {
+            key: sum(kind_stats[key] for kind_stats in stats.values())
+            for key in ("entries", "bytes", "hits", "misses", "evictions")
+        }
+        stats["total"]["budget_bytes"] = self._memory_budget_bytes
+        return stats
 
-    def set_financial_metrics(self, ticker: str, data: list[dict[str, any]]):
-        """Append new financial metrics to cache."""
-        self._financial_metrics_cache[ticker] = self._merge_data(self._financial_metrics_cache.get(ticker), data, key_field="report_period")
+    def get_prices(self, ticker: str) -> PriceSeries | None:
+        """Get the cached, date-sorted price series if available."""
+        return self._load(self._prices_cache, "prices", ticker, decode=PriceSeries.from_dict)
 
-    def get_line_items(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached line items if available."""
-        return self._line_items_cache.get(ticker)
+    def set_prices(self, ticker: str, data: list[dict[str, any]], start_date: str | None = None, end_date: str | None = None):
+        """Merge new price data into the cached series, recording [start_date, end_date] as fetched when given."""
+        with self._lock:
+            self._drop_market_caps(ticker)
+            series = self.get_prices(ticker) or PriceSeries.empty()
+            self._save(self._prices_cache, "prices", ticker, series.merge(data), encode=PriceSeries.to_dict)
+            if start_date and end_date and start_date <= end_date:
+                coverage = add_interval(self.get_price_coverage(ticker), start_date, end_date)
+                self._save(self._price_coverage_cache, "price_coverage", ticker, coverage)
 
-    def set_line_items(self, ticker: str, data: list[dict[str, any]]):
-        """Append new line items to cache."""
-        self._line_items_cache[ticker] = self._merge_data(self._line_items_cache.get(ticker), data, key_field="report_period")
+    def get_price_coverage(self, ticker: str) -> list[list[str]]:
+        """Get the sorted, non-overlapping date intervals that have been fetched for a ticker."""
+        # Coverage is meaningless without the rows it describes (e.g. after a TTL expiry)
+        if self.get_prices(ticker) is None:
+            return []
+        return self._load(self._price_coverage_cache, "price_coverage", ticker) or []
 
-    def get_insider_trades(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached insider trades if available."""
-        return self._insider_trades_cache.get(ticker)
+    def get_missing_price_ranges(self, ticker: str, start_date: str, end_date: str) -> list[tuple[str, str]]:
+        """Get the sub-ranges of [start_date, end_date] that still need to be fetched for a ticker."""
+        return missing_intervals(self.get_price_coverage(ticker), start_date, end_date)
+
+    def get_financial_metrics(self, ticker: str, period: str, end_date: str, limit: int) -> list[dict[str, any]] | None:
+        """Get cached financial metrics if an earlier fetch guarantees the answer is complete, newest first.
+
+        A request is served locally when some earlier fetch for the same period had an
+        end date on or after `end_date` and proved `limit` reports back complete.
+        """
+        entry = self._load(self._financial_metrics_cache, "financial_metrics", f"{ticker}|{period}")
+        if not entry:
+            return None
+        for fetch in entry["fetches"]:
+            if end_date > fetch["end_date"]:
+                continue
+            report_periods = complete_report_periods(fetch, entry["rows"], end_date, limit)
+            if report_periods is not None:
+                return [entry["rows"][rp] for rp in report_periods]
+        return None
+
+    def set_financial_metrics(self, ticker: str, period: str, end_date: str, limit: int, data: list[dict[str, any]]):
+        """Merge a financial metrics fetch into the cache, keyed by period and report period."""
+        with self._lock:
+            self._drop_market_caps(ticker)
+            key = f"{ticker}|{period}"
+            entry = self._load(self._financial_metrics_cache, "financial_metrics", key) or {"rows": {}, "fetches": []}
+            for row in data:
+                entry["rows"][row["report_period"]] = row
+            fetch = new_fetch_record(end_date, limit, data)
+            if fetch not in entry["fetches"]:
+                entry["fetches"].append(fetch)
+            self._save(self._financial_metrics_cache, "financial_metrics", key, entry)
+
+    def get_line_items(self, ticker: str, period: str, line_items: list[str], end_date: str, limit: int) -> list[dict[str, any]] | None:
+        """Get cached line items if an earlier fetch guarantees the answer is complete, newest first.
+
+        A request is served locally when some earlier fetch for the same period asked
+        for a superset of `line_items` with an end date on or after `end_date`, and
+        the rows that fetch proved complete cover `limit` reports back from `end_date`.
+        """
+        entry = self._load(self._line_items_cache, "line_items", f"{ticker}|{period}")
+        if not entry:
+            return None
+        requested = set(line_items)
+        for fetch in entry["fetches"]:
+            if end_date > fetch["end_date"] or not requested.issubset(fetch["line_items"]):
+                continue
+            report_periods = complete_report_periods(fetch, (rp for rp in entry["rows"] if requested.issubset(entry["row_items"][rp])), end_date, limit)
+            if report_periods is not None:
+                base_fields = ("ticker", "report_period", "period", "currency")
+                return [{key: value for key, value in entry["rows"][rp].items() if key in base_fields or key in requested} for rp in report_periods]
+        return None
+
+    def set_line_items(self, ticker: str, period: str, line_items: list[str], end_date: str, limit: int, data: list[dict[str, any]]):
+        """Merge the result of a line item search into the cache, keyed by report period."""
+        with self._lock:
+            self._drop_market_caps(ticker)
+            key = f"{ticker}|{period}"
+            entry = self._load(self._line_items_cache, "line_items", key) or {"rows": {}, "row_items": {}, "fetches": []}
+            for row in data:
+                report_period = row["report_period"]
+                entry["rows"].setdefault(report_period, {}).update(row)
+                entry["row_items"][report_period] = sorted(set(entry["row_items"].get(report_period, [])) | set(line_items))
+            fetch = {**new_fetch_record(end_date, limit, data), "line_items": sorted(set(line_items))}
+            if fetch not in entry["fetches"]:
+                entry["fetches"].append(fetch)
+            self._save(self._line_items_cache, "line_items", key, entry)
+
+    def get_market_cap(self, ticker: str, end_date: str, max_metrics_age_days: int | None = None) -> tuple[bool, float | None]:
+        """Get a memoized market cap as (found, value), since None is a valid memoized value."""
+        with self._lock:
+            memo = self._market_cap_cache.get(ticker) or {}
+        key = (end_date, max_metrics_age_days)
+        return key in memo, memo.get(key)
+
+    def set_market_cap(self, ticker: str, end_date: str, max_metrics_age_days: int | None, market_cap: float | None):
+        """Memoize a market cap; dropped whenever prices, metrics or line items for the ticker change."""
+        with self._lock:
+            memo = self._market_cap_cache.get(ticker) or {}
+            memo[(end_date, max_metrics_age_days)] = market_cap
+            self._market_cap_cache[ticker] = memo
+
+    def get_insider_trades(self, ticker: str) -> DatedRows | None:
+        """Get cached insider trades if available, sorted by transaction date (filing date if missing)."""
+        return self._load(self._insider_trades_cache, "insider_trades", ticker, decode=partial(DatedRows, _insider_trade_date, insider_trade_key))
 
     def set_insider_trades(self, ticker: str, data: list[dict[str, any]]):
-        """Append new insider trades to cache."""
-        self._insider_trades_cache[ticker] = self._merge_data(self._insider_trades_cache.get(ticker), data, key_field="filing_date")  # Could also use transaction_date if preferred
+        """Add insider trades not cached yet, keyed by filing date, insider, transaction date and shares."""
+        with self._lock:
+            trades = self.get_insider_trades(ticker) or DatedRows(_insider_trade_date, insider_trade_key)
+            if trades.merge(data) or ticker not in self._insider_trades_cache:
+                self._save(self._insider_trades_cache, "insider_trades", ticker, trades, encode=DatedRows.to_records)
 
-    def get_company_news(self, ticker: str) -> list[dict[str, any]] | None:
-        """Get cached company news if available."""
-        return self._company_news_cache.get(ticker)
+    def get_company_news(self, ticker: str) -> DatedRows | None:
+        """Get cached company news if available, sorted by date."""
+        return self._load(self._company_news_cache, "company_news", ticker, decode=partial(DatedRows, _news_date, news_key))
 
     def set_company_news(self, ticker: str, data: list[dict[str, any]]):
-        """Append new company news to cache."""
-        self._company_news_cache[ticker] = self._merge_data(self._company_news_cache.get(ticker), data, key_field="date")
-
+        """Add news articles not cached yet, keyed by URL."""
+        with self._lock:
+            news = self.get_company_news(ticker) or DatedRows(_news_date, news_key)
+            if news.merge(data) or ticker not in self._company_news_cache:
+                self._save(self._company_news_cache, "company_news", ticker, news, encode=DatedRows.to_records)
 
 # Global cache instance
 _cache = Cache()
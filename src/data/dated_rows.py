@@ -0,0 +1,72 @@
+"""Cached rows kept sorted by date, so date-window queries are a binary search rather than a scan."""
+
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from heapq import merge as merge_sorted
+from operator import itemgetter
+
+from data.lru import approx_size
+
+
+class DatedRows:
+    """Rows sorted ascending by an effective date, with a parallel list of dates for bisecting.
+
+    `date_of(row)` gives the date a row is filtered and ordered by (e.g. the transaction
+    date of an insider trade, falling back to its filing date), and `key_of(row)` its
+    natural key. The set of keys is kept alongside the rows, so a merge only looks at
+    the new rows and skips exact repeats without dropping distinct rows that share a date.
+    """
+
+    def __init__(self, date_of, key_of, rows: list[dict] | None = None):
+        self.date_of = date_of
+        self.key_of = key_of
+        self.rows: list[dict] = []
+        self.dates: list[str] = []
+        self.keys: set = set()
+        self._lock = threading.Lock()
+        self.merge(rows or [])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def nbytes(self) -> int:
+        # Keys mostly reference strings already held by the rows, so only the set itself is counted
+        return approx_size(self.rows) + approx_size(self.dates) + sys.getsizeof(self.keys)
+
+    def merge(self, rows: list[dict]) -> int:
+        """Insert the rows whose key is not cached yet, keeping date order. Returns how many were added."""
+        with self._lock:
+            new = []
+            for row in rows:
+                key = self.key_of(row)
+                if key not in self.keys:
+                    self.keys.add(key)
+                    new.append((self.date_of(row), row))
+            if not new:
+                return 0
+            # The API returns rows newest first, so sort the batch once and merge it in one
+            # linear pass; rows sharing a date keep their insertion order (both sorts are stable)
+            new.sort(key=itemgetter(0))
+            if not self.dates or new[0][0] >= self.dates[-1]:
+                self.dates.extend(date for date, _ in new)
+                self.rows.extend(row for _, row in new)
+            else:
+                merged = list(merge_sorted(zip(self.dates, self.rows), new, key=itemgetter(0)))
+                self.dates = [date for date, _ in merged]
+                self.rows = [row for _, row in merged]
+            return len(new)
+
+    def window(self, start_date: str | None, end_date: str, limit: int | None = None) -> list[dict]:
+        """Rows dated within [start_date, end_date], newest first, at most `limit` of them."""
+        with self._lock:
+            hi = bisect_right(self.dates, end_date)
+            lo = bisect_left(self.dates, start_date, 0, hi) if start_date else 0
+            if limit is not None:
+                lo = max(lo, hi - limit)
+            return self.rows[lo:hi][::-1]
+
+    def to_records(self) -> list[dict]:
+        with self._lock:
+            return list(self.rows)
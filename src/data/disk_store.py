@@ -0,0 +1,123 @@
+"""SQLite-backed persistent store for cached API payloads."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any
+
+
+class DiskStore:
+    """Persistent key/value store with a freshness TTL and a total size cap.
+
+    Values are JSON-serialisable payloads stored zlib-compressed, keyed by
+    (kind, key) - e.g. ("prices", "AAPL"). When the store grows past
+    ``max_bytes`` the least recently accessed entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float | None = None, max_bytes: int | None = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # One connection shared across threads; access is serialised by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, filename: str = "financial_data.sqlite3", prefix: str = "FINANCIAL_DATA_CACHE") -> "DiskStore | None":
+        """Build a store from ``<prefix>_DIR``, ``<prefix>_TTL_HOURS`` and ``<prefix>_MAX_MB``.
+
+        Returns None when ``<prefix>_DIR`` is unset, i.e. persistence is disabled.
+        """
+        directory = os.environ.get(f"{prefix}_DIR")
+        if not directory:
+            return None
+        ttl_hours = float(os.environ.get(f"{prefix}_TTL_HOURS", "24"))
+        max_mb = float(os.environ.get(f"{prefix}_MAX_MB", "512"))
+        return cls(
+            os.path.join(os.path.expanduser(directory), filename),
+            ttl_seconds=ttl_hours * 3600 if ttl_hours > 0 else None,
+            max_bytes=int(max_mb * 1024 * 1024) if max_mb > 0 else None,
+        )
+
+    def load(self, kind: str, key: str) -> Any | None:
+        """Return the stored value, or None if it is missing or older than the TTL."""
+        with self._lock:
+            row = self._conn.execute("SELECT payload, updated_at FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if row is None:
+                return None
+            payload, updated_at = row
+            now = time.time()
+            if self.ttl_seconds is not None and now - updated_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE kind = ? AND key = ?", (now, kind, key))
+            self._conn.commit()
+        return json.loads(zlib.decompress(payload))
+
+    def save(self, kind: str, key: str, value: Any):
+        """Store a value, replacing any previous entry, then enforce the size cap."""
+        payload = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, payload, size, updated_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, payload, len(payload), now, now),
+            )
+            self._enforce_size_cap()
+            self._conn.commit()
+
+    def delete(self, kind: str, key: str):
+        """Remove a single entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            self._conn.commit()
+
+    def clear(self, kind: str | None = None):
+        """Remove every entry, or every entry of one kind."""
+        with self._lock:
+            if kind is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE kind = ?", (kind,))
+            self._conn.commit()
+
+    def total_bytes(self) -> int:
+        """Total compressed size of all stored payloads."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _enforce_size_cap(self):
+        """Evict least recently accessed entries until the store fits in max_bytes. Caller holds the lock."""
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for kind, key, size in self._conn.execute("SELECT kind, key, size FROM entries ORDER BY accessed_at ASC").fetchall():
+            self._conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            total -= size
+            if total <= self.max_bytes:
+                break
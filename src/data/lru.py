@@ -0,0 +1,108 @@
+"""Size-bounded LRU mapping with approximate byte accounting, used by the in-memory data cache."""
+
+import sys
+from collections import OrderedDict
+
+import numpy as np
+
+_MISSING = object()
+
+# Lists longer than this are sized from a sample of their first items
+_SAMPLE_SIZE = 16
+
+
+def approx_size(value) -> int:
+    """Roughly estimate the memory held by a cached value, in bytes.
+
+    Recurses into dicts and lists and trusts an `nbytes` attribute where one exists
+    (NumPy arrays, PriceSeries); long lists are extrapolated from a sample, so this
+    stays cheap for large payloads.
+    """
+    if isinstance(value, np.ndarray):
+        size = value.nbytes
+        if value.dtype == object:
+            size += sum(sys.getsizeof(item) for item in value[:_SAMPLE_SIZE].tolist()) * len(value) // max(1, min(len(value), _SAMPLE_SIZE))
+        return size
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        sample = value[:_SAMPLE_SIZE]
+        return sys.getsizeof(value) + sum(approx_size(item) for item in sample) * len(value) // len(sample)
+    return sys.getsizeof(value)
+
+
+class LRUStore:
+    """Mapping that evicts least recently used entries once their estimated size exceeds a budget.
+
+    `on_evict(key)` is called for each evicted key so that dependent state can be dropped too.
+    """
+
+    def __init__(self, budget_bytes: int | None = None, on_evict=None):
+        self.budget_bytes = budget_bytes
+        self._on_evict = on_evict
+        self._entries: OrderedDict[str, any] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default=None):
+        """Return the value for key, marking it most recently used and counting the hit or miss."""
+        value = self._entries.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        self.pop(key, None)
+        size = approx_size(value)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def pop(self, key: str, default=None):
+        """Remove and return an entry without counting it as an eviction."""
+        if key not in self._entries:
+            return default
+        self.bytes -= self._sizes.pop(key)
+        return self._entries.pop(key)
+
+    def _evict(self):
+        # Never evict the entry that was just inserted, even if it alone exceeds the budget
+        while self.budget_bytes is not None and self.bytes > self.budget_bytes and len(self._entries) > 1:
+            key, _ = self._entries.popitem(last=False)
+            self.bytes -= self._sizes.pop(key)
+            self.evictions += 1
+            if self._on_evict:
+                self._on_evict(key)
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
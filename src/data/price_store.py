@@ -0,0 +1,121 @@
+"""Columnar, array-backed storage for daily price history."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+# Column order of the float block; matches the field order of data.models.Price
+OHLC_COLUMNS = ["open", "close", "high", "low"]
+
+
+def to_epoch_day(day: str) -> int:
+    """Convert a YYYY-MM-DD (or longer ISO timestamp) string to days since 1970-01-01."""
+    return int((np.datetime64(day[:10], "D") - _EPOCH).astype(np.int64))
+
+
+class PriceSeries:
+    """Daily prices for one ticker, kept sorted by date in parallel NumPy arrays.
+
+    ``days`` holds int64 epoch days and ``ohlc`` a (n, 4) float64 block, so a
+    date window is two ``searchsorted`` calls and every slice is a view on the
+    underlying arrays rather than a copy. Arrays are read-only because slices
+    are shared with callers.
+    """
+
+    def __init__(self, days: np.ndarray, time: np.ndarray, ohlc: np.ndarray, volume: np.ndarray, index: pd.DatetimeIndex | None = None):
+        for array in (days, time, ohlc, volume):
+            array.flags.writeable = False
+        self.days = days
+        self.time = time
+        self.ohlc = ohlc
+        self.volume = volume
+        self._index = index
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        """Parsed timestamps, computed once per stored series and shared by its slices."""
+        if self._index is None:
+            self._index = pd.DatetimeIndex(pd.to_datetime(self.time), name="Date")
+        return self._index
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=object), np.empty((0, 4), dtype=np.float64), np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def from_records(cls, records: list[dict[str, any]]) -> "PriceSeries":
+        """Build a sorted series from Price-shaped dicts; later records win on duplicate dates."""
+        if not records:
+            return cls.empty()
+        time = np.array([record["time"] for record in records], dtype=object)
+        days = np.array([to_epoch_day(t) for t in time], dtype=np.int64)
+        ohlc = np.array([[record[column] for column in OHLC_COLUMNS] for record in records], dtype=np.float64)
+        volume = np.array([record["volume"] for record in records], dtype=np.int64)
+        return cls._sorted_unique(days, time, ohlc, volume)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, list]) -> "PriceSeries":
+        """Rebuild a series from the column dict produced by to_dict()."""
+        time = np.array(data["time"], dtype=object)
+        days = np.array([to_epoch_day(t) for t in time], dtype=np.int64)
+        ohlc = np.array(data["ohlc"], dtype=np.float64).reshape(-1, 4)
+        return cls(days, time, ohlc, np.array(data["volume"], dtype=np.int64))
+
+    @classmethod
+    def _sorted_unique(cls, days: np.ndarray, time: np.ndarray, ohlc: np.ndarray, volume: np.ndarray) -> "PriceSeries":
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        # Keep the last occurrence of each day (stable sort preserves input order within a day)
+        keep = np.append(days[1:] != days[:-1], True)
+        order = order[keep]
+        return cls(days[keep], time[order], ohlc[order], volume[order])
+
+    def merge(self, records: list[dict[str, any]]) -> "PriceSeries":
+        """Return a new series with the records merged in; new rows replace existing rows for the same date."""
+        if not records:
+            return self
+        new = PriceSeries.from_records(records)
+        if not len(self):
+            return new
+        return PriceSeries._sorted_unique(
+            np.concatenate([self.days, new.days]),
+            np.concatenate([self.time, new.time]),
+            np.concatenate([self.ohlc, new.ohlc]),
+            np.concatenate([self.volume, new.volume]),
+        )
+
+    def slice(self, start_date: str, end_date: str) -> "PriceSeries":
+        """Return the rows with start_date <= date <= end_date as a zero-copy view."""
+        lo = np.searchsorted(self.days, to_epoch_day(start_date), side="left")
+        hi = np.searchsorted(self.days, to_epoch_day(end_date), side="right")
+        return PriceSeries(self.days[lo:hi], self.time[lo:hi], self.ohlc[lo:hi], self.volume[lo:hi], self.index[lo:hi])
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays, counting each time string as a separate object."""
+        time_strings = sum(sys.getsizeof(t) for t in self.time[:1].tolist()) * len(self.time)
+        return self.days.nbytes + self.time.nbytes + time_strings + self.ohlc.nbytes + self.volume.nbytes
+
+    def to_records(self) -> list[dict[str, any]]:
+        """Convert to Price-shaped dicts."""
+        return [
+            {"open": o, "close": c, "high": h, "low": l, "volume": v, "time": t}
+            for (o, c, h, l), v, t in zip(self.ohlc.tolist(), self.volume.tolist(), self.time.tolist())
+        ]
+
+    def to_dict(self) -> dict[str, list]:
+        """Convert to a JSON-serialisable column dict."""
+        return {"time": self.time.tolist(), "ohlc": self.ohlc.tolist(), "volume": self.volume.tolist()}
+
+    def to_df(self) -> pd.DataFrame:
+        """Convert to the same frame layout as tools.api.prices_to_df, sharing the read-only OHLC block."""
+        df = pd.DataFrame(self.ohlc, columns=OHLC_COLUMNS, index=self.index, copy=False)
+        df["volume"] = self.volume
+        df["time"] = self.time
+        return df
@@ -0,0 +1,370 @@
+"""Deterministic synthetic market data shaped like the financialdatasets.ai responses.
+
+Every ticker gets its own reproducible history: daily prices from a geometric
+Brownian motion, quarterly fundamentals whose income statement, balance sheet,
+cash flows and ratios agree with each other and with the price, insider trades
+and news headlines. Histories are generated lazily per ticker and the most
+recently used ones are kept, so arbitrarily many tickers can be served.
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from data.models import FinancialMetrics
+
+# Income statement and cash flow items, summed over the quarters of a TTM or annual report
+FLOW_ITEMS = [
+    "revenue",
+    "gross_profit",
+    "operating_expense",
+    "research_and_development",
+    "operating_income",
+    "ebit",
+    "ebitda",
+    "depreciation_and_amortization",
+    "net_income",
+    "capital_expenditure",
+    "free_cash_flow",
+    "dividends_and_other_cash_distributions",
+    "issuance_or_purchase_of_equity_shares",
+]
+
+# Balance sheet items, taken at the end of the report period
+STOCK_ITEMS = [
+    "total_assets",
+    "total_liabilities",
+    "shareholders_equity",
+    "current_assets",
+    "current_liabilities",
+    "working_capital",
+    "cash_and_equivalents",
+    "total_debt",
+    "goodwill_and_intangible_assets",
+    "intangible_assets",
+    "outstanding_shares",
+]
+
+INSIDER_FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Susan", "William", "Karen"]
+INSIDER_LAST_NAMES = ["Smith", "Johnson", "Lee", "Brown", "Garcia", "Miller", "Davis", "Chen", "Wilson", "Moore", "Taylor", "Clark"]
+INSIDER_TITLES = ["Chief Executive Officer", "Chief Financial Officer", "Chief Operating Officer", "General Counsel", "Director", "Director", "Director", "EVP, Sales"]
+NEWS_SOURCES = ["Reuters", "Bloomberg", "MarketWatch", "Barron's", "The Motley Fool", "Seeking Alpha", "Yahoo Finance"]
+NEWS_HEADLINES = {
+    "positive": ["{ticker} beats estimates as revenue climbs", "Analysts upgrade {ticker} on margin expansion", "{ticker} raises full-year guidance", "{ticker} shares rally after product launch"],
+    "negative": ["{ticker} misses earnings expectations", "{ticker} cut to underweight on slowing growth", "{ticker} faces regulatory probe", "{ticker} shares slide as costs rise"],
+    "neutral": ["{ticker} to present at industry conference", "What to watch in {ticker}'s next quarter", "{ticker} announces board changes", "{ticker} reaffirms outlook"],
+}
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+class SyntheticTicker:
+    """The full generated history of one ticker, with query methods mirroring the API endpoints."""
+
+    def __init__(self, ticker: str, seed: int, start_date: str, end_date: str):
+        self.ticker = ticker
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+        self._generate_prices(rng, start_date, end_date)
+        self._generate_fundamentals(rng, start_date, end_date)
+        self.ohlc = np.round(self._unit_ohlc * self._initial_price, 2)
+        self._generate_insider_trades(rng)
+        self._generate_news(rng)
+        self._reports = {period: self._build_reports(period) for period in ("quarterly", "ttm", "annual")}
+
+    # Generation
+
+    def _generate_fundamentals(self, rng: np.random.Generator, start_date: str, end_date: str):
+        months = np.arange(np.datetime64(start_date[:7], "M"), np.datetime64(end_date[:7], "M") + 1)
+        quarter_months = months[(months.astype(int) % 12) % 3 == 2]
+        # Quarter ends: the last day of March, June, September and December
+        quarter_ends = (quarter_months + 1).astype("datetime64[D]") - 1
+        self.quarter_ends = quarter_ends[quarter_ends <= np.datetime64(end_date)]
+        n = len(self.quarter_ends)
+
+        # Revenue tracks the price path with some noise, so valuation multiples stay plausible over decades
+        price_indices = np.maximum(np.searchsorted(self.price_days, self.quarter_ends, side="right") - 1, 0)
+        price_path = self._unit_ohlc[price_indices, 1] if len(self.price_days) else np.ones(n)
+        revenue = rng.uniform(2e8, 2e10) / 4 * price_path * rng.lognormal(0, 0.05, n)
+        gross_margin = np.clip(rng.uniform(0.25, 0.7) + rng.normal(0, 0.02, n), 0.05, 0.95)
+        operating_margin = np.clip(gross_margin * rng.uniform(0.3, 0.6) + rng.normal(0, 0.02, n), -0.2, gross_margin)
+        research = revenue * rng.uniform(0.0, 0.15)
+        depreciation = revenue * rng.uniform(0.02, 0.08)
+        capex = -revenue * rng.uniform(0.03, 0.1) * rng.lognormal(0, 0.2, n)
+        operating_income = revenue * operating_margin
+        net_income = operating_income * rng.uniform(0.7, 0.85)
+
+        asset_turnover = rng.uniform(0.4, 1.5)
+        total_assets = revenue * 4 / asset_turnover * rng.lognormal(0, 0.03, n)
+        total_liabilities = total_assets * np.clip(rng.uniform(0.3, 0.7) + rng.normal(0, 0.02, n), 0.1, 0.9)
+        current_assets = total_assets * rng.uniform(0.25, 0.45)
+        current_liabilities = total_liabilities * rng.uniform(0.3, 0.5)
+        goodwill = total_assets * rng.uniform(0.0, 0.3)
+        shares = rng.uniform(5e7, 5e9) * np.exp(np.cumsum(rng.normal(-0.003, 0.005, n)))
+        share_change = np.diff(shares, prepend=shares[0])
+
+        self.quarters = {
+            "revenue": revenue,
+            "gross_profit": revenue * gross_margin,
+            "operating_expense": revenue * (gross_margin - operating_margin),
+            "research_and_development": research,
+            "operating_income": operating_income,
+            "ebit": operating_income,
+            "ebitda": operating_income + depreciation,
+            "depreciation_and_amortization": depreciation,
+            "net_income": net_income,
+            "capital_expenditure": capex,
+            "free_cash_flow": net_income + depreciation + capex,
+            "dividends_and_other_cash_distributions": -np.maximum(net_income, 0) * rng.uniform(0, 0.5),
+            "total_assets": total_assets,
+            "total_liabilities": total_liabilities,
+            "shareholders_equity": total_assets - total_liabilities,
+            "current_assets": current_assets,
+            "current_liabilities": current_liabilities,
+            "working_capital": current_assets - current_liabilities,
+            "cash_and_equivalents": current_assets * rng.uniform(0.2, 0.5),
+            "total_debt": total_liabilities * rng.uniform(0.3, 0.6),
+            "goodwill_and_intangible_assets": goodwill,
+            "intangible_assets": goodwill * rng.uniform(0.2, 0.5),
+            "outstanding_shares": shares,
+            # Buybacks are negative, issuance positive, valued at a rough book value per share
+            "issuance_or_purchase_of_equity_shares": share_change * (total_assets - total_liabilities) / shares,
+        }
+        # Start the price near a plausible earnings multiple of the first year's earnings per share
+        first_year_eps = net_income[:4].sum() * 4 / max(1, min(n, 4)) / shares[0] if n else 1.0
+        self._initial_price = max(1.0, first_year_eps * rng.uniform(12, 30))
+
+    def _generate_prices(self, rng: np.random.Generator, start_date: str, end_date: str):
+        """Daily bars from a geometric Brownian motion starting at 1; scaled to a price once fundamentals exist."""
+        days = np.arange(np.datetime64(start_date), np.datetime64(end_date) + 1)
+        self.price_days = days[np.is_busday(days)]
+        n = len(self.price_days)
+        mu, sigma = rng.normal(0.1, 0.04), rng.uniform(0.15, 0.4)
+        dt = 1 / TRADING_DAYS_PER_YEAR
+        log_returns = rng.normal((mu - sigma**2 / 2) * dt, sigma * np.sqrt(dt), n)
+        close = np.exp(np.cumsum(log_returns))
+        open_ = np.concatenate([[1.0], close[:-1]]) * np.exp(rng.normal(0, sigma * np.sqrt(dt) / 4, n))
+        high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, sigma * np.sqrt(dt) / 2, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, sigma * np.sqrt(dt) / 2, n)))
+        self.returns = log_returns
+        self._unit_ohlc = np.column_stack([open_, close, high, low])
+        self.volume = (rng.lognormal(np.log(rng.uniform(2e5, 5e7)), 0.4, n) * (1 + 20 * np.abs(log_returns))).astype(np.int64)
+
+    def _generate_insider_trades(self, rng: np.random.Generator):
+        titles = rng.choice(INSIDER_TITLES, size=rng.integers(4, 9))
+        names = [f"{first} {last}" for first, last in zip(rng.choice(INSIDER_FIRST_NAMES, len(titles)), rng.choice(INSIDER_LAST_NAMES, len(titles)))]
+        holdings = rng.integers(10_000, 2_000_000, len(titles)).astype(float)
+
+        count = rng.poisson(len(self.price_days) / TRADING_DAYS_PER_YEAR * 24) if len(self.price_days) else 0
+        day_indices = np.sort(rng.integers(0, max(1, len(self.price_days)), count))
+        insiders = rng.integers(0, len(titles), count)
+        # Insiders sell more often than they buy, mostly small slices of their holdings
+        fractions = rng.uniform(0.01, 0.2, count) * np.where(rng.random(count) < 0.3, 1, -1)
+        filing_dates = np.busday_offset(self.price_days[day_indices], rng.integers(1, 4, count), roll="forward").astype(str)
+
+        self._insider_trades = []
+        for day_index, insider, fraction, filing_date in zip(day_indices.tolist(), insiders.tolist(), fractions.tolist(), filing_dates.tolist()):
+            price = float(self.ohlc[day_index, 1])
+            before = float(holdings[insider])
+            shares = float(round(before * fraction))
+            holdings[insider] += shares
+            self._insider_trades.append(
+                {
+                    "ticker": self.ticker,
+                    "issuer": f"{self.ticker} Inc.",
+                    "name": names[insider],
+                    "title": str(titles[insider]),
+                    "is_board_director": titles[insider] == "Director",
+                    "transaction_date": str(self.price_days[day_index]),
+                    "transaction_shares": shares,
+                    "transaction_price_per_share": price,
+                    "transaction_value": round(shares * price, 2),
+                    "shares_owned_before_transaction": before,
+                    "shares_owned_after_transaction": before + shares,
+                    "security_title": "Common Stock",
+                    "filing_date": filing_date,
+                }
+            )
+        self._insider_trades.sort(key=lambda trade: trade["filing_date"])
+        self._trade_filing_dates = [trade["filing_date"] for trade in self._insider_trades]
+
+    def _generate_news(self, rng: np.random.Generator):
+        day_indices = np.repeat(np.arange(len(self.price_days)), rng.poisson(0.8, len(self.price_days)))
+        count = len(day_indices)
+        # Headlines lean towards the direction of the day's move
+        move = self.returns[day_indices] / (np.std(self.returns) or 1) if count else np.empty(0)
+        draw = rng.random(count) * (np.maximum(0.1, 1 + move) + 1 + np.maximum(0.1, 1 - move))
+        sentiments = np.where(draw < np.maximum(0.1, 1 + move), "positive", np.where(draw < np.maximum(0.1, 1 + move) + 1, "neutral", "negative"))
+        headline_choices = rng.integers(0, len(NEWS_HEADLINES["neutral"]), count)
+        authors = [f"{first} {last}" for first, last in zip(rng.choice(INSIDER_FIRST_NAMES, count), rng.choice(INSIDER_LAST_NAMES, count))]
+        sources = rng.choice(NEWS_SOURCES, count)
+        minutes = rng.integers(6 * 60, 22 * 60, count)
+        order = np.lexsort((minutes, day_indices))
+
+        self._news = []
+        previous_day, i = None, 0
+        for index in order.tolist():
+            day = str(self.price_days[day_indices[index]])
+            i = i + 1 if day == previous_day else 0
+            previous_day = day
+            sentiment = str(sentiments[index])
+            self._news.append(
+                {
+                    "ticker": self.ticker,
+                    "title": NEWS_HEADLINES[sentiment][headline_choices[index]].format(ticker=self.ticker),
+                    "author": authors[index],
+                    "source": str(sources[index]),
+                    "date": f"{day}T{minutes[index] // 60:02d}:{minutes[index] % 60:02d}:00Z",
+                    "url": f"https://news.example.com/{self.ticker.lower()}/{day}/{i}",
+                    "sentiment": sentiment,
+                }
+            )
+        self._news_days = [news["date"][:10] for news in self._news]
+
+    # Reports
+
+    def _build_reports(self, period: str) -> list[dict]:
+        """All reports of one period type, oldest first, each holding every line item and metric."""
+        if period == "quarterly":
+            ends = range(len(self.quarter_ends))
+            window, annualize = 1, 4
+        else:
+            ends = range(3, len(self.quarter_ends))
+            if period == "annual":
+                ends = [i for i in ends if str(self.quarter_ends[i])[5:7] == "12"]
+            window, annualize = 4, 1
+
+        reports = []
+        for i in ends:
+            report = {"ticker": self.ticker, "report_period": str(self.quarter_ends[i]), "period": period, "currency": "USD"}
+            report.update({item: float(self.quarters[item][i - window + 1 : i + 1].sum()) for item in FLOW_ITEMS})
+            report.update({item: float(self.quarters[item][i]) for item in STOCK_ITEMS})
+            report.update(self._metrics(report, reports[-1] if reports else None, annualize))
+            reports.append(report)
+        return reports
+
+    def _metrics(self, report: dict, previous: dict | None, annualize: int) -> dict:
+        def ratio(numerator, denominator):
+            return float(numerator / denominator) if denominator else None
+
+        def growth(item):
+            return ratio(report[item] - previous[item], abs(previous[item])) if previous else None
+
+        price_index = np.searchsorted(self.price_days, np.datetime64(report["report_period"]), side="right") - 1
+        price = float(self.ohlc[price_index, 1]) if price_index >= 0 else self._initial_price
+        shares = report["outstanding_shares"]
+        market_cap = price * shares
+        enterprise_value = market_cap + report["total_debt"] - report["cash_and_equivalents"]
+        revenue, net_income = report["revenue"] * annualize, report["net_income"] * annualize
+        inventory = report["current_assets"] * 0.3
+        receivables = report["current_assets"] * 0.3
+        cost_of_revenue = (report["revenue"] - report["gross_profit"]) * annualize
+        earnings_per_share = ratio(report["net_income"], shares)
+        price_to_earnings = ratio(market_cap, net_income)
+        earnings_growth = growth("net_income")
+        inventory_turnover = ratio(cost_of_revenue, inventory)
+        receivables_turnover = ratio(revenue, receivables)
+        days_sales_outstanding = ratio(365, receivables_turnover)
+        metrics = {
+            "market_cap": market_cap,
+            "enterprise_value": enterprise_value,
+            "price_to_earnings_ratio": price_to_earnings,
+            "price_to_book_ratio": ratio(market_cap, report["shareholders_equity"]),
+            "price_to_sales_ratio": ratio(market_cap, revenue),
+            "enterprise_value_to_ebitda_ratio": ratio(enterprise_value, report["ebitda"] * annualize),
+            "enterprise_value_to_revenue_ratio": ratio(enterprise_value, revenue),
+            "free_cash_flow_yield": ratio(report["free_cash_flow"] * annualize, market_cap),
+            "peg_ratio": ratio(price_to_earnings, earnings_growth * 100) if price_to_earnings and earnings_growth and earnings_growth > 0 else None,
+            "gross_margin": ratio(report["gross_profit"], report["revenue"]),
+            "operating_margin": ratio(report["operating_income"], report["revenue"]),
+            "net_margin": ratio(report["net_income"], report["revenue"]),
+            "return_on_equity": ratio(net_income, report["shareholders_equity"]),
+            "return_on_assets": ratio(net_income, report["total_assets"]),
+            "return_on_invested_capital": ratio(report["operating_income"] * annualize * 0.79, report["total_debt"] + report["shareholders_equity"]),
+            "asset_turnover": ratio(revenue, report["total_assets"]),
+            "inventory_turnover": inventory_turnover,
+            "receivables_turnover": receivables_turnover,
+            "days_sales_outstanding": days_sales_outstanding,
+            "operating_cycle": days_sales_outstanding + 365 / inventory_turnover if days_sales_outstanding and inventory_turnover else None,
+            "working_capital_turnover": ratio(revenue, report["working_capital"]),
+            "current_ratio": ratio(report["current_assets"], report["current_liabilities"]),
+            "quick_ratio": ratio(report["current_assets"] - inventory, report["current_liabilities"]),
+            "cash_ratio": ratio(report["cash_and_equivalents"], report["current_liabilities"]),
+            "operating_cash_flow_ratio": ratio((report["net_income"] + report["depreciation_and_amortization"]) * annualize, report["current_liabilities"]),
+            "debt_to_equity": ratio(report["total_debt"], report["shareholders_equity"]),
+            "debt_to_assets": ratio(report["total_debt"], report["total_assets"]),
+            "interest_coverage": ratio(report["ebit"] * annualize, report["total_debt"] * 0.05),
+            "revenue_growth": growth("revenue"),
+            "earnings_growth": earnings_growth,
+            "book_value_growth": growth("shareholders_equity"),
+            "earnings_per_share_growth": ratio(earnings_per_share - previous["net_income"] / previous["outstanding_shares"], abs(previous["net_income"] / previous["outstanding_shares"])) if previous else None,
+            "free_cash_flow_growth": growth("free_cash_flow"),
+            "operating_income_growth": growth("operating_income"),
+            "ebitda_growth": growth("ebitda"),
+            "payout_ratio": ratio(-report["dividends_and_other_cash_distributions"], report["net_income"]),
+            "earnings_per_share": earnings_per_share,
+            "book_value_per_share": ratio(report["shareholders_equity"], shares),
+            "free_cash_flow_per_share": ratio(report["free_cash_flow"], shares),
+        }
+        return metrics
+
+    # Queries, with the filtering and ordering of the corresponding API endpoints
+
+    def prices(self, start_date: str, end_date: str) -> list[dict]:
+        lo = np.searchsorted(self.price_days, np.datetime64(start_date[:10]), side="left")
+        hi = np.searchsorted(self.price_days, np.datetime64(end_date[:10]), side="right")
+        return [
+            {"open": row[0], "close": row[1], "high": row[2], "low": row[3], "volume": int(volume), "time": str(day)}
+            for day, row, volume in zip(self.price_days[lo:hi], self.ohlc[lo:hi].tolist(), self.volume[lo:hi])
+        ]
+
+    def _latest_reports(self, period: str, end_date: str, limit: int) -> list[dict]:
+        reports = self._reports.get(period, [])
+        hi = np.searchsorted([report["report_period"] for report in reports], end_date[:10], side="right")
+        return reports[max(0, hi - limit) : hi][::-1]
+
+    def financial_metrics(self, end_date: str, period: str, limit: int) -> list[dict]:
+        return [{field: report[field] for field in FinancialMetrics.model_fields} for report in self._latest_reports(period, end_date, limit)]
+
+    def line_items(self, line_items: list[str], end_date: str, period: str, limit: int) -> list[dict]:
+        base_fields = ("ticker", "report_period", "period", "currency")
+        return [{**{field: report[field] for field in base_fields}, **{item: report.get(item) for item in line_items}} for report in self._latest_reports(period, end_date, limit)]
+
+    def insider_trades(self, filing_date_lte: str, filing_date_gte: str | None, limit: int) -> list[dict]:
+        hi = np.searchsorted(self._trade_filing_dates, filing_date_lte[:10], side="right")
+        lo = np.searchsorted(self._trade_filing_dates, filing_date_gte[:10], side="left") if filing_date_gte else 0
+        return self._insider_trades[max(lo, hi - limit) : hi][::-1]
+
+    def company_news(self, end_date: str, start_date: str | None, limit: int) -> list[dict]:
+        hi = np.searchsorted(self._news_days, end_date[:10], side="right")
+        lo = np.searchsorted(self._news_days, start_date[:10], side="left") if start_date else 0
+        return self._news[max(lo, hi - limit) : hi][::-1]
+
+
+class SyntheticMarket:
+    """Generates tickers on first request and keeps the `max_tickers` most recently used ones."""
+
+    def __init__(self, seed: int = 0, start_date: str = "2000-01-01", end_date: str | None = None, max_tickers: int = 256):
+        self.seed = seed
+        self.start_date = start_date
+        self.end_date = end_date or date.today().isoformat()
+        self.max_tickers = max_tickers
+        self._tickers: OrderedDict[str, SyntheticTicker] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ticker(self, ticker: str) -> SyntheticTicker:
+        ticker = ticker.upper()
+        with self._lock:
+            if ticker in self._tickers:
+                self._tickers.move_to_end(ticker)
+                return self._tickers[ticker]
+        # Generate outside the lock so different tickers are built concurrently; generation is
+        # deterministic, so two threads racing on the same ticker produce identical histories
+        history = SyntheticTicker(ticker, self.seed, self.start_date, self.end_date)
+        with self._lock:
+            self._tickers[ticker] = history
+            while len(self._tickers) > self.max_tickers:
+                self._tickers.popitem(last=False)
+        return history
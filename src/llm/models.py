@@ -1,4 +1,5 @@
 import os
+import threading
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_groq import ChatGroq
@@ -113,53 +114,103 @@ AVAILABLE_MODELS = [
 # Create LLM_ORDER in the format expected by the UI
 LLM_ORDER = [model.to_choice_tuple() for model in AVAILABLE_MODELS]
 
+# Request budgets per provider, enforced by utils.llm.call_llm / acall_llm: requests in flight at
+# once, requests per minute and tokens per minute (None = unlimited). Defaults match entry-level
+# API tiers; override with <PREFIX>_MAX_CONCURRENCY, <PREFIX>_RPM and <PREFIX>_TPM, where the
+# prefix is the provider's API key variable without _API_KEY (e.g. OPENAI_RPM=5000, 0 = unlimited).
+PROVIDER_LIMITS = {
+    ModelProvider.ANTHROPIC: {"max_concurrency": 8, "requests_per_minute": 50, "tokens_per_minute": 40_000},
+    ModelProvider.DEEPSEEK: {"max_concurrency": 16, "requests_per_minute": None, "tokens_per_minute": None},
+    ModelProvider.GEMINI: {"max_concurrency": 8, "requests_per_minute": 15, "tokens_per_minute": 1_000_000},
+    ModelProvider.GROQ: {"max_concurrency": 8, "requests_per_minute": 30, "tokens_per_minute": 6_000},
+    ModelProvider.OPENAI: {"max_concurrency": 16, "requests_per_minute": 500, "tokens_per_minute": 30_000},
+}
+
 def get_model_info(model_name: str) -> LLMModel | None:
     """Get model information by model_name"""
     return next((model for model in AVAILABLE_MODELS if model.model_name == model_name), None)
 
-def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | ChatGroq | None:
+# Chat clients, built once per (provider, model, base URL, API key) so each keeps its HTTP connection
+# pool warm across calls, and their structured-output wrappers per output schema
+_clients: dict[tuple, ChatOpenAI | ChatGroq | ChatAnthropic | ChatGoogleGenerativeAI] = {}
+_structured_clients: dict[tuple, any] = {}
+_clients_lock = threading.Lock()
+
+# Provider -> (API key environment variable, display name used in errors)
+_PROVIDER_API_KEYS = {
+    ModelProvider.GROQ: ("GROQ_API_KEY", "Groq"),
+    ModelProvider.OPENAI: ("OPENAI_API_KEY", "OpenAI"),
+    ModelProvider.ANTHROPIC: ("ANTHROPIC_API_KEY", "Anthropic"),
+    ModelProvider.DEEPSEEK: ("DEEPSEEK_API_KEY", "DeepSeek"),
+    ModelProvider.GEMINI: ("GOOGLE_API_KEY", "Google"),
+}
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+
+def get_provider_limits(model_provider: ModelProvider) -> dict[str, int | None]:
+    """PROVIDER_LIMITS for a provider with any environment overrides applied."""
+    model_provider = ModelProvider(model_provider)
+    prefix = _PROVIDER_API_KEYS[model_provider][0].removesuffix("_API_KEY")
+    limits = dict(PROVIDER_LIMITS.get(model_provider, {"max_concurrency": None, "requests_per_minute": None, "tokens_per_minute": None}))
+    for field, suffix in (("max_concurrency", "MAX_CONCURRENCY"), ("requests_per_minute", "RPM"), ("tokens_per_minute", "TPM")):
+        if value := os.getenv(f"{prefix}_{suffix}"):
+            limits[field] = int(value) or None
+    return limits
+
+def _client_key(model_name: str, model_provider: ModelProvider) -> tuple:
+    """Resolve the API key and base URL for a model, raising if the key is not set."""
+    model_provider = ModelProvider(model_provider)
+    env_var, name = _PROVIDER_API_KEYS[model_provider]
+    api_key = os.getenv(env_var)
+    if not api_key:
+        # Print error to console
+        print(f"API Key Error: Please make sure {env_var} is set in your .env file.")
+        raise ValueError(f"{name} API key not found.  Please make sure {env_var} is set in your .env file.")
+    if model_provider == ModelProvider.OPENAI:
+        # Check for custom base URL
+        base_url = os.getenv("OPENAI_API_BASE") or None
+    elif model_provider == ModelProvider.DEEPSEEK:
+        base_url = DEEPSEEK_BASE_URL
+    else:
+        base_url = None
+    return (model_provider, model_name, base_url, api_key)
+
+def _create_model(model_provider: ModelProvider, model_name: str, base_url: str | None, api_key: str):
     if model_provider == ModelProvider.GROQ:
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            # Print error to console
-            print(f"API Key Error: Please make sure GROQ_API_KEY is set in your .env file.")
-            raise ValueError("Groq API key not found.  Please make sure GROQ_API_KEY is set in your .env file.")
         return ChatGroq(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.OPENAI:
-        # Get and validate API key
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            # Print error to console
-            print(f"API Key Error: Please make sure OPENAI_API_KEY is set in your .env file.")
-            raise ValueError("OpenAI API key not found.  Please make sure OPENAI_API_KEY is set in your .env file.")
-        # Check for custom base URL
-        base_url = os.getenv("OPENAI_API_BASE")
         if base_url:
-             print(f"Using custom OpenAI base URL: {base_url}")
-             return ChatOpenAI(model=model_name, api_key=api_key, base_url=base_url)
-        else:
-             return ChatOpenAI(model=model_name, api_key=api_key)
+            print(f"Using custom OpenAI base URL: {base_url}")
+            return ChatOpenAI(model=model_name, api_key=api_key, base_url=base_url)
+        return ChatOpenAI(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.ANTHROPIC:
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            print(f"API Key Error: Please make sure ANTHROPIC_API_KEY is set in your .env file.")
-            raise ValueError("Anthropic API key not found.  Please make sure ANTHROPIC_API_KEY is set in your .env file.")
         return ChatAnthropic(model=model_name, api_key=api_key)
     elif model_provider == ModelProvider.DEEPSEEK:
-        api_key = os.getenv("DEEPSEEK_API_KEY")
-        if not api_key:
-            print(f"API Key Error: Please make sure DEEPSEEK_API_KEY is set in your .env file.")
-            raise ValueError("DeepSeek API key not found.  Please make sure DEEPSEEK_API_KEY is set in your .env file.")
-        base_url="https://api.deepseek.com/v1"
         print(f"INFO: Initializing DeepSeek model '{model_name}' via OpenAI wrapper with base URL: {base_url}")
         return ChatOpenAI(model=model_name, api_key=api_key, base_url=base_url)
     elif model_provider == ModelProvider.GEMINI:
-        api_key = os.getenv("GOOGLE_API_KEY")
-        if not api_key:
-            print(f"API Key Error: Please make sure GOOGLE_API_KEY is set in your .env file.")
-            raise ValueError("Google API key not found.  Please make sure GOOGLE_API_KEY is set in your .env file.")
         return ChatGoogleGenerativeAI(model=model_name, api_key=api_key)
 
+def _get_client(key: tuple):
+    """Return the client for a _client_key, creating it on first use. Caller holds _clients_lock."""
+    if key not in _clients:
+        _clients[key] = _create_model(*key)
+    return _clients[key]
+
+def get_model(model_name: str, model_provider: ModelProvider) -> ChatOpenAI | ChatGroq | None:
+    """Get the shared chat client for a model, creating it on first use."""
+    key = _client_key(model_name, model_provider)
+    with _clients_lock:
+        return _get_client(key)
+
+def get_structured_model(model_name: str, model_provider: ModelProvider, schema: type[BaseModel], method: str = "json_mode"):
+    """Get the shared client wrapped with with_structured_output for a Pydantic schema, creating it on first use."""
+    key = _client_key(model_name, model_provider)
+    with _clients_lock:
+        if (key, schema, method) not in _structured_clients:
+            _structured_clients[(key, schema, method)] = _get_client(key).with_structured_output(schema, method=method)
+        return _structured_clients[(key, schema, method)]
+
 # Add a function to get default model configuration
 def get_default_model() -> LLMModel:
     """Returns the default model configuration (e.g., DeepSeek R1)."""
@@ -0,0 +1,131 @@
+"""Local stand-in for the financialdatasets.ai endpoints used by tools/api.py, serving synthetic data.
+
+Start it, then point the app at it through FINANCIAL_DATASETS_API_BASE:
+
+    python src/local_api_server.py --port 8765
+    FINANCIAL_DATASETS_API_BASE=http://127.0.0.1:8765 python src/backtester.py --ticker AAPL,MSFT
+
+Any ticker is accepted; its history is generated on first request (see data/synthetic.py)
+and is the same on every run for a given --seed.
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from data.synthetic import SyntheticMarket
+
+
+class SyntheticAPIHandler(BaseHTTPRequestHandler):
+    """Implements the prices, financial-metrics, line-items search, insider-trades and news endpoints."""
+
+    # Set on the server class by serve()
+    market: SyntheticMarket
+    latency_seconds: float = 0.0
+    error_rate: float = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {
+            "/prices": self._prices,
+            "/financial-metrics": self._financial_metrics,
+            "/insider-trades": self._insider_trades,
+            "/news": self._news,
+        }
+        self._dispatch(routes.get(url.path.rstrip("/")), query)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._send(400, {"error": "Request body must be JSON"})
+        routes = {"/financials/search/line-items": self._line_items}
+        self._dispatch(routes.get(url.path.rstrip("/")), body)
+
+    def _dispatch(self, handler, params: dict):
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        if handler is None:
+            return self._send(404, {"error": f"Unknown endpoint {self.path}"})
+        # Simulated rate limiting and server failures, for exercising retries and the circuit breaker
+        if self.error_rate and random.random() < self.error_rate:
+            status = random.choice([429, 500, 503])
+            return self._send(status, {"error": "Simulated failure"}, headers={"Retry-After": "1"} if status == 429 else None)
+        try:
+            self._send(200, handler(params))
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": f"Bad request: {e}"})
+
+    def _send(self, status: int, payload: dict, headers: dict | None = None):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _prices(self, query: dict) -> dict:
+        ticker = query["ticker"]
+        return {"ticker": ticker, "prices": self.market.ticker(ticker).prices(query["start_date"], query["end_date"])}
+
+    def _financial_metrics(self, query: dict) -> dict:
+        history = self.market.ticker(query["ticker"])
+        return {"financial_metrics": history.financial_metrics(query["report_period_lte"], query.get("period", "ttm"), int(query.get("limit", 10)))}
+
+    def _line_items(self, body: dict) -> dict:
+        results = []
+        for ticker in body["tickers"]:
+            results.extend(self.market.ticker(ticker).line_items(body["line_items"], body["end_date"], body.get("period", "ttm"), int(body.get("limit", 10))))
+        return {"search_results": results}
+
+    def _insider_trades(self, query: dict) -> dict:
+        history = self.market.ticker(query["ticker"])
+        return {"insider_trades": history.insider_trades(query["filing_date_lte"], query.get("filing_date_gte"), int(query.get("limit", 1000)))}
+
+    def _news(self, query: dict) -> dict:
+        history = self.market.ticker(query["ticker"])
+        return {"news": history.company_news(query["end_date"], query.get("start_date"), int(query.get("limit", 1000)))}
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, market: SyntheticMarket | None = None, latency_ms: float = 0.0, error_rate: float = 0.0, quiet: bool = False) -> ThreadingHTTPServer:
+    """Create the server; call serve_forever() on the result (or run it on a thread in tests and benchmarks)."""
+    handler = type("Handler", (SyntheticAPIHandler,), {"market": market or SyntheticMarket(), "latency_seconds": latency_ms / 1000, "error_rate": error_rate})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic financial data on the financialdatasets.ai API routes")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated histories")
+    parser.add_argument("--history-start", type=str, default="2000-01-01", help="First date of generated history (YYYY-MM-DD)")
+    parser.add_argument("--max-tickers", type=int, default=256, help="Generated ticker histories kept in memory")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 429, 500 or 503")
+    parser.add_argument("--quiet", action="store_true", help="Do not log each request")
+    args = parser.parse_args()
+
+    market = SyntheticMarket(seed=args.seed, start_date=args.history_start, max_tickers=args.max_tickers)
+    server = serve(args.host, args.port, market, args.latency_ms, args.error_rate, args.quiet)
+    print(f"Serving synthetic financial data on http://{args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
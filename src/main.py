@@ -18,7 +18,8 @@ from agents.valuation import valuation_agent
 from agents.quantitative_analyst import run_quantitative_analysis
 from graph.state import AgentState
 from utils.display import print_trading_output
-from utils.analysts import ANALYST_ORDER, get_analyst_nodes
+from utils.analysts import ANALYST_ORDER, get_analyst_nodes, get_data_plan
+from tools.async_api import prefetch_plan
 from utils.progress import progress
 from llm.models import LLM_ORDER, get_model_info, get_default_model
 import io
@@ -145,8 +146,13 @@ def run_hedge_fund_core(
     selected_analysts: list[str] = None, # Receives list like ["warren_buffett_agent", "quantitative_analyst"]
     model_name: str = "gpt-4o",
     model_provider: str = "OpenAI",
+    prefetch: bool = True,
 ):
-    """Core logic to run the hedge fund simulation. Callable directly."""
+    """Core logic to run the hedge fund simulation. Callable directly.
+
+    With prefetch=False the selected agents' data is not prefetched first, for callers such
+    as the backtester that prefetch a whole period up front.
+    """
     # Start progress tracking (if needed, consider making it optional for non-CLI)
     # progress.start() # Commented out for now, might add too much noise in webapp
 
@@ -208,6 +214,15 @@ def run_hedge_fund_core(
         
         print(f"Selected LLM agents for workflow: {selected_llm_analysts}")
 
+        # --- Prefetch the union of the selected agents' data in one batched pass ---
+        # Line item searches are coalesced into one per (ticker, period) and every other
+        # endpoint is fetched once over the widest window, so the agents read from the cache.
+        if prefetch:
+            data_plan = get_data_plan(selected_llm_analysts, start_date, end_date)
+            print(f"Pre-fetching data for {len(tickers)} ticker(s): {len(data_plan['line_items'])} line item search(es) and {len(data_plan['financial_metrics'])} metrics fetch(es) per ticker")
+            for (ticker, label), error in prefetch_plan(tickers, data_plan).items():
+                print(f"Warning: Failed to pre-fetch {label} for {ticker}: {error}")
+
         # --- Run LangGraph Workflow for SELECTED LLM-based Agents --- 
         print("\n--- Running LLM-based Agent Workflow ---")
         # Create and compile the workflow ONLY with selected LLM analysts
@@ -329,6 +344,7 @@ def run_hedge_fund(
     selected_analysts: list[str] = [], # Kept default as empty list for backward compatibility
     model_name: str = "gpt-4o",
     model_provider: str = "OpenAI",
+    prefetch: bool = True,
 ):
     """Directly call the core function."""
     return run_hedge_fund_core(
@@ -340,6 +356,7 @@ def run_hedge_fund(
         selected_analysts=selected_analysts if selected_analysts else None, # Pass None if empty list
         model_name=model_name,
         model_provider=model_provider,
+        prefetch=prefetch,
     )
 
 
@@ -1,8 +1,13 @@
+import datetime
 import os
+from typing import Iterator
+
 import pandas as pd
-import requests
 
-from data.cache import get_cache
+from data.cache import get_cache, insider_trade_key, news_key
+from data.price_store import OHLC_COLUMNS, PriceSeries
+from tools.http_client import FinancialDataAPIError, get_http_client
+from tools.single_flight import single_flight
 from data.models import (
     CompanyNews,
     CompanyNewsResponse,
@@ -19,36 +24,73 @@ from data.models import (
 # Global cache instance
 _cache = get_cache()
 
+# Largest page the insider-trades and news endpoints are asked for
+MAX_PAGE_SIZE = 1000
+
+# The fetchers below are wrapped in @single_flight: when several agents ask for the same
+# data at the same moment, one request goes out and every caller receives its result.
+
+
+def _api_base() -> str:
+    """Base URL of the data API; FINANCIAL_DATASETS_API_BASE can point it elsewhere, e.g. at src/local_api_server.py."""
+    return os.environ.get("FINANCIAL_DATASETS_API_BASE", "https://api.financialdatasets.ai").rstrip("/")
+
+
+def _request(method: str, url: str, ticker: str, **kwargs):
+    """Send a request through the shared HTTP client and raise on any non-200 response.
+
+    The client adds the API key, picked from the configured key pool (see tools.key_pool).
+    """
+    response = get_http_client().request(method, url, **kwargs)
+    if response.status_code != 200:
+        raise FinancialDataAPIError(f"Error fetching data: {ticker} - {response.status_code} - {response.text}", status_code=response.status_code)
+    return response
+
+
+# Rows are validated once, when the API response is parsed, and cached as plain dicts. Reads build
+# models with model_construct (no re-validation), and the *_df variants build DataFrames from the
+# cached rows directly without creating any per-row models.
+
+
+def _rows_to_df(rows: list[dict], model) -> pd.DataFrame:
+    """Build a DataFrame from cached rows, keeping the model's columns even when there are no rows."""
+    columns = list(model.model_fields)
+    columns += [key for key in (rows[0] if rows else {}) if key not in model.model_fields]
+    return pd.DataFrame.from_records(rows, columns=columns)
+
 
 def get_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
     """Fetch price data from cache or API."""
-    # Check cache first
-    if cached_data := _cache.get_prices(ticker):
-        # Filter cached data by date range and convert to Price objects
-        filtered_data = [Price(**price) for price in cached_data if start_date <= price["time"] <= end_date]
-        if filtered_data:
-            return filtered_data
-
-    # If not in cache or no data in range, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
-
-    url = f"https://api.financialdatasets.ai/prices/?ticker={ticker}&interval=day&interval_multiplier=1&start_date={start_date}&end_date={end_date}"
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+    return [Price.model_construct(**price) for price in _get_price_series(ticker, start_date, end_date).to_records()]
 
-    # Parse response with Pydantic model
-    price_response = PriceResponse(**response.json())
-    prices = price_response.prices
 
-    if not prices:
-        return []
+def _get_price_series(ticker: str, start_date: str, end_date: str) -> PriceSeries:
+    """Get the cached price series for a date range, fetching any uncovered gaps first."""
+    # Only fetch the parts of the window that have not been fetched before. Later bars do
+    # not exist yet, and today's may still change, so coverage stops at yesterday and
+    # today is fetched again on every call.
+    today = datetime.date.today()
+    fetch_end_date = min(end_date, today.isoformat())
+    covered_end_date = (today - datetime.timedelta(days=1)).isoformat()
+    for gap_start, gap_end in _cache.get_missing_price_ranges(ticker, start_date, fetch_end_date):
+        prices = _fetch_prices(ticker, gap_start, gap_end)
+        # Cache the results as dicts, recording the gap as covered even if it had no trading days
+        _cache.set_prices(ticker, [p.model_dump() for p in prices], gap_start, min(gap_end, covered_end_date))
 
-    # Cache the results as dicts
-    _cache.set_prices(ticker, [p.model_dump() for p in prices])
-    return prices
+    # Resolve the window with a binary search over the sorted, columnar cache
+    series = _cache.get_prices(ticker) or PriceSeries.empty()
+    return series.slice(start_date, end_date)
+
+
+@single_flight
+def _fetch_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
+    """Fetch price data for a date range from the API."""
+    url = f"{_api_base()}/prices/?ticker={ticker}&interval=day&interval_multiplier=1&start_date={start_date}&end_date={end_date}"
+    response = _request("GET", url, ticker)
+
+    # Parse response with Pydantic model
+    price_response = PriceResponse(**response.json())
+    return price_response.prices
 
 
 def get_financial_metrics(
@@ -58,37 +100,40 @@ def get_financial_metrics(
     limit: int = 10,
 ) -> list[FinancialMetrics]:
     """Fetch financial metrics from cache or API."""
-    # Check cache first
-    if cached_data := _cache.get_financial_metrics(ticker):
-        # Filter cached data by date and limit
-        filtered_data = [FinancialMetrics(**metric) for metric in cached_data if metric["report_period"] <= end_date]
-        filtered_data.sort(key=lambda x: x.report_period, reverse=True)
-        if filtered_data:
-            return filtered_data[:limit]
+    return [FinancialMetrics.model_construct(**metric) for metric in _get_financial_metrics_rows(ticker, end_date, period, limit)]
 
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
 
-    url = f"https://api.financialdatasets.ai/financial-metrics/?ticker={ticker}&report_period_lte={end_date}&limit={limit}&period={period}"
-    response = requests.get(url, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+def get_financial_metrics_df(
+    ticker: str,
+    end_date: str,
+    period: str = "ttm",
+    limit: int = 10,
+) -> pd.DataFrame:
+    """Fetch financial metrics as a DataFrame, newest report first."""
+    return _rows_to_df(_get_financial_metrics_rows(ticker, end_date, period, limit), FinancialMetrics)
+
+
+@single_flight
+def _get_financial_metrics_rows(ticker: str, end_date: str, period: str, limit: int) -> list[dict]:
+    """Fetch financial metrics as validated dicts from cache or API."""
+    # Check cache first; an earlier fetch for the same period with a later end date may already cover this one
+    if (cached_data := _cache.get_financial_metrics(ticker, period, end_date, limit)) is not None:
+        return cached_data
+
+    # If not in cache or insufficient data, fetch from API
+    url = f"{_api_base()}/financial-metrics/?ticker={ticker}&report_period_lte={end_date}&limit={limit}&period={period}"
+    response = _request("GET", url, ticker)
 
     # Parse response with Pydantic model
     metrics_response = FinancialMetricsResponse(**response.json())
-    # Return the FinancialMetrics objects directly instead of converting to dict
-    financial_metrics = metrics_response.financial_metrics
+    financial_metrics = [m.model_dump() for m in metrics_response.financial_metrics][:limit]
 
-    if not financial_metrics:
-        return []
-
-    # Cache the results as dicts
-    _cache.set_financial_metrics(ticker, [m.model_dump() for m in financial_metrics])
+    # Cache the results, including empty ones, so the same request is not repeated
+    _cache.set_financial_metrics(ticker, period, end_date, limit, financial_metrics)
     return financial_metrics
 
 
+@single_flight
 def search_line_items(
     ticker: str,
     line_items: list[str],
@@ -96,13 +141,13 @@ def search_line_items(
     period: str = "ttm",
     limit: int = 10,
 ) -> list[LineItem]:
-    """Fetch line items from API."""
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    """Fetch line items from cache or API."""
+    # Check cache first; an earlier search for a superset of items or a later end date may already cover this one
+    if (cached_data := _cache.get_line_items(ticker, period, line_items, end_date, limit)) is not None:
+        return [LineItem.model_construct(**item) for item in cached_data]
 
-    url = "https://api.financialdatasets.ai/financials/search/line-items"
+    # If not in cache or insufficient data, fetch from API
+    url = f"{_api_base()}/financials/search/line-items"
 
     body = {
         "tickers": [ticker],
@@ -111,17 +156,14 @@ def search_line_items(
         "period": period,
         "limit": limit,
     }
-    response = requests.post(url, headers=headers, json=body)
-    if response.status_code != 200:
-        raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
+    response = _request("POST", url, ticker, json=body)
     data = response.json()
     response_model = LineItemResponse(**data)
-    search_results = response_model.search_results
-    if not search_results:
-        return []
+    search_results = response_model.search_results[:limit]
 
-    # Cache the results
-    return search_results[:limit]
+    # Cache the results, including empty ones, so the same search is not repeated
+    _cache.set_line_items(ticker, period, line_items, end_date, limit, [item.model_dump() for item in search_results])
+    return search_results
 
 
 def get_insider_trades(
@@ -131,65 +173,112 @@ def get_insider_trades(
     limit: int = 1000,
 ) -> list[InsiderTrade]:
     """Fetch insider trades from cache or API."""
+    return [InsiderTrade.model_construct(**trade) for trade in _get_insider_trades_rows(ticker, end_date, start_date, limit)]
+
+
+def get_insider_trades_df(
+    ticker: str,
+    end_date: str,
+    start_date: str | None = None,
+    limit: int = 1000,
+) -> pd.DataFrame:
+    """Fetch insider trades as a DataFrame."""
+    return _rows_to_df(_get_insider_trades_rows(ticker, end_date, start_date, limit), InsiderTrade)
+
+
+@single_flight
+def _get_insider_trades_rows(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[dict]:
+    """Fetch insider trades as validated dicts from cache or API."""
     # Check cache first
-    if cached_data := _cache.get_insider_trades(ticker):
-        # Filter cached data by date range
-        filtered_data = [InsiderTrade(**trade) for trade in cached_data 
-                        if (start_date is None or (trade.get("transaction_date") or trade["filing_date"]) >= start_date)
-                        and (trade.get("transaction_date") or trade["filing_date"]) <= end_date]
-        filtered_data.sort(key=lambda x: x.transaction_date or x.filing_date, reverse=True)
-        if filtered_data:
-            return filtered_data
+    if filtered_data := _cached_insider_trades(ticker, end_date, start_date, limit):
+        return filtered_data
 
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    # If not in cache or insufficient data, fetch from API, paging through the window only when it has a start
+    fetched = [trade for page in _fetch_insider_trade_pages(ticker, end_date, start_date, limit, paginate=start_date is not None) for trade in page]
+    # Answer from the cache the fetch just filled, so this call and a repeat of it (a cache hit) return the same rows
+    return _cached_insider_trades(ticker, end_date, start_date, limit) or fetched[:limit]
+
+
+def _cached_insider_trades(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[dict]:
+    """Cached insider trades within the window, newest first, at most `limit` of them."""
+    cached_data = _cache.get_insider_trades(ticker)
+    # Binary search the date-sorted cache for the window
+    return cached_data.window(start_date, end_date, limit) if cached_data else []
 
-    all_trades = []
+
+def iter_insider_trades(
+    ticker: str,
+    end_date: str,
+    start_date: str | None = None,
+    limit: int = 1000,
+) -> Iterator[list[InsiderTrade]]:
+    """Yield insider trades newest first, one page at a time, up to `limit` trades in total.
+
+    Each page holds at most min(limit, 1000) trades and is only requested once the caller
+    asks for it, so breaking out of the loop early skips the remaining requests. Trades
+    already cached for the window are served from the cache instead.
+    """
+    page_size = min(limit, MAX_PAGE_SIZE)
+    if rows := _cached_insider_trades(ticker, end_date, start_date, limit):
+        for i in range(0, len(rows), page_size):
+            yield [InsiderTrade.model_construct(**trade) for trade in rows[i : i + page_size]]
+        return
+
+    remaining = limit
+    for page in _fetch_insider_trade_pages(ticker, end_date, start_date, page_size, paginate=True):
+        page = page[:remaining]
+        yield [InsiderTrade.model_construct(**trade) for trade in page]
+        remaining -= len(page)
+        if remaining <= 0:
+            return
+
+
+def _fetch_insider_trade_pages(ticker: str, end_date: str, start_date: str | None, page_size: int, paginate: bool) -> Iterator[list[dict]]:
+    """Fetch insider trades from the API page by page, newest first, caching each page as it arrives."""
+    seen = set()
     current_end_date = end_date
-    
+
     while True:
-        url = f"https://api.financialdatasets.ai/insider-trades/?ticker={ticker}&filing_date_lte={current_end_date}"
+        url = f"{_api_base()}/insider-trades/?ticker={ticker}&filing_date_lte={current_end_date}"
         if start_date:
             url += f"&filing_date_gte={start_date}"
-        url += f"&limit={limit}"
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
-        
+        url += f"&limit={page_size}"
+
+        response = _request("GET", url, ticker)
+
         data = response.json()
         response_model = InsiderTradeResponse(**data)
         insider_trades = response_model.insider_trades
-        
-        if not insider_trades:
+
+        # Consecutive pages overlap on their boundary filing date, so drop trades already yielded
+        page = []
+        for trade in insider_trades:
+            row = trade.model_dump()
+            if (key := insider_trade_key(row)) not in seen:
+                seen.add(key)
+                page.append(row)
+        if not page:
             break
-            
-        all_trades.extend(insider_trades)
-        
-        # Only continue pagination if we have a start_date and got a full page
-        if not start_date or len(insider_trades) < limit:
+
+        # Cache the results
+        _cache.set_insider_trades(ticker, page)
+        yield page
+
+        # Only continue pagination if asked to and we got a full page
+        if not paginate or len(insider_trades) < page_size:
             break
-            
+
         # Update end_date to the oldest filing date from current batch for next iteration
         # Ensure there are trades with filing_date before taking min
         valid_dates = [trade.filing_date for trade in insider_trades if trade.filing_date]
         if not valid_dates:
-             break # Cannot determine next page boundary
-        current_end_date = min(valid_dates).split('T')[0]
-        
+            break  # Cannot determine next page boundary
+        current_end_date = min(valid_dates).split("T")[0]
+
         # If we've reached or passed the start_date, we can stop
         if start_date is not None and current_end_date <= start_date:
             break
 
-    if not all_trades:
-        return []
-
-    # Cache the results
-    _cache.set_insider_trades(ticker, [trade.model_dump() for trade in all_trades])
-    return all_trades
-
 
 def get_company_news(
     ticker: str,
@@ -198,80 +287,157 @@ def get_company_news(
     limit: int = 1000,
 ) -> list[CompanyNews]:
     """Fetch company news from cache or API."""
+    return [CompanyNews.model_construct(**news) for news in _get_company_news_rows(ticker, end_date, start_date, limit)]
+
+
+def get_company_news_df(
+    ticker: str,
+    end_date: str,
+    start_date: str | None = None,
+    limit: int = 1000,
+) -> pd.DataFrame:
+    """Fetch company news as a DataFrame."""
+    return _rows_to_df(_get_company_news_rows(ticker, end_date, start_date, limit), CompanyNews)
+
+
+@single_flight
+def _get_company_news_rows(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[dict]:
+    """Fetch company news as validated dicts from cache or API."""
     # Check cache first
-    if cached_data := _cache.get_company_news(ticker):
-        # Filter cached data by date range
-        filtered_data = [CompanyNews(**news) for news in cached_data 
-                        if (start_date is None or news["date"] >= start_date)
-                        and news["date"] <= end_date]
-        filtered_data.sort(key=lambda x: x.date, reverse=True)
-        if filtered_data:
-            return filtered_data
+    if filtered_data := _cached_company_news(ticker, end_date, start_date, limit):
+        return filtered_data
 
-    # If not in cache or insufficient data, fetch from API
-    headers = {}
-    if api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY"):
-        headers["X-API-KEY"] = api_key
+    # If not in cache or insufficient data, fetch from API, paging through the window only when it has a start
+    fetched = [news for page in _fetch_company_news_pages(ticker, end_date, start_date, limit, paginate=start_date is not None) for news in page]
+    # Answer from the cache the fetch just filled, so this call and a repeat of it (a cache hit) return the same rows
+    return _cached_company_news(ticker, end_date, start_date, limit) or fetched[:limit]
+
+
+def _cached_company_news(ticker: str, end_date: str, start_date: str | None, limit: int) -> list[dict]:
+    """Cached company news within the window, newest first, at most `limit` of them."""
+    cached_data = _cache.get_company_news(ticker)
+    # Binary search the date-sorted cache for the window
+    return cached_data.window(start_date, end_date, limit) if cached_data else []
 
-    all_news = []
+
+def iter_company_news(
+    ticker: str,
+    end_date: str,
+    start_date: str | None = None,
+    limit: int = 1000,
+) -> Iterator[list[CompanyNews]]:
+    """Yield company news newest first, one page at a time, up to `limit` articles in total.
+
+    Each page holds at most min(limit, 1000) articles and is only requested once the caller
+    asks for it, so breaking out of the loop early skips the remaining requests. News
+    already cached for the window is served from the cache instead.
+    """
+    page_size = min(limit, MAX_PAGE_SIZE)
+    if rows := _cached_company_news(ticker, end_date, start_date, limit):
+        for i in range(0, len(rows), page_size):
+            yield [CompanyNews.model_construct(**news) for news in rows[i : i + page_size]]
+        return
+
+    remaining = limit
+    for page in _fetch_company_news_pages(ticker, end_date, start_date, page_size, paginate=True):
+        page = page[:remaining]
+        yield [CompanyNews.model_construct(**news) for news in page]
+        remaining -= len(page)
+        if remaining <= 0:
+            return
+
+
+def _fetch_company_news_pages(ticker: str, end_date: str, start_date: str | None, page_size: int, paginate: bool) -> Iterator[list[dict]]:
+    """Fetch company news from the API page by page, newest first, caching each page as it arrives."""
+    seen = set()
     current_end_date = end_date
-    
+
     while True:
-        url = f"https://api.financialdatasets.ai/news/?ticker={ticker}&end_date={current_end_date}"
+        url = f"{_api_base()}/news/?ticker={ticker}&end_date={current_end_date}"
         if start_date:
             url += f"&start_date={start_date}"
-        url += f"&limit={limit}"
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code != 200:
-            raise Exception(f"Error fetching data: {ticker} - {response.status_code} - {response.text}")
-        
+        url += f"&limit={page_size}"
+
+        response = _request("GET", url, ticker)
+
         data = response.json()
         response_model = CompanyNewsResponse(**data)
         company_news = response_model.news
-        
-        if not company_news:
+
+        # Consecutive pages overlap on their boundary date, so drop articles already yielded
+        page = []
+        for news in company_news:
+            row = news.model_dump()
+            if (key := news_key(row)) not in seen:
+                seen.add(key)
+                page.append(row)
+        if not page:
             break
-            
-        all_news.extend(company_news)
-        
-        # Only continue pagination if we have a start_date and got a full page
-        if not start_date or len(company_news) < limit:
+
+        # Cache the results
+        _cache.set_company_news(ticker, page)
+        yield page
+
+        # Only continue pagination if asked to and we got a full page
+        if not paginate or len(company_news) < page_size:
             break
-            
+
         # Update end_date to the oldest date from current batch for next iteration
         # Ensure there are news items with dates before taking min
         valid_dates = [news.date for news in company_news if news.date]
         if not valid_dates:
-             break # Cannot determine next page boundary
-        current_end_date = min(valid_dates).split('T')[0]
-        
+            break  # Cannot determine next page boundary
+        current_end_date = min(valid_dates).split("T")[0]
+
         # If we've reached or passed the start_date, we can stop
         if start_date is not None and current_end_date <= start_date:
             break
 
-    if not all_news:
-        return []
-
-    # Cache the results
-    _cache.set_company_news(ticker, [news.model_dump() for news in all_news])
-    return all_news
-
-
 
 def get_market_cap(
     ticker: str,
     end_date: str,
+    max_metrics_age_days: int | None = None,
 ) -> float | None:
-    """Fetch market cap from the API."""
+    """Fetch market cap from cache or API.
+
+    Results are memoized per (ticker, end_date) until the cached data for the ticker changes.
+    If `max_metrics_age_days` is given and the latest metrics report is older than that,
+    the market cap is derived from the latest close times shares outstanding instead.
+    """
+    found, market_cap = _cache.get_market_cap(ticker, end_date, max_metrics_age_days)
+    if found:
+        return market_cap
+
     financial_metrics = get_financial_metrics(ticker, end_date)
-    market_cap = financial_metrics[0].market_cap
-    if not market_cap:
-        return None
+    latest = financial_metrics[0] if financial_metrics else None
+    market_cap = latest.market_cap if latest else None
 
+    if max_metrics_age_days is not None:
+        report_age_days = (datetime.date.fromisoformat(end_date) - datetime.date.fromisoformat(latest.report_period[:10])).days if latest else None
+        if report_age_days is None or report_age_days > max_metrics_age_days:
+            market_cap = _derive_market_cap(ticker, end_date) or market_cap
+
+    market_cap = market_cap or None
+    _cache.set_market_cap(ticker, end_date, max_metrics_age_days, market_cap)
     return market_cap
 
 
+def _derive_market_cap(ticker: str, end_date: str) -> float | None:
+    """Estimate market cap as the latest close on or before end_date times the latest shares outstanding."""
+    line_items = search_line_items(ticker, ["outstanding_shares"], end_date, period="ttm", limit=1)
+    shares_outstanding = getattr(line_items[0], "outstanding_shares", None) if line_items else None
+    if not shares_outstanding:
+        return None
+
+    # Look back far enough to cover weekends and market holidays
+    start_date = (datetime.date.fromisoformat(end_date) - datetime.timedelta(days=10)).isoformat()
+    prices = _get_price_series(ticker, start_date, end_date)
+    if not len(prices):
+        return None
+    return float(prices.ohlc[-1, OHLC_COLUMNS.index("close")]) * shares_outstanding
+
+
 def prices_to_df(prices: list[Price]) -> pd.DataFrame:
     """Convert prices to a DataFrame."""
     df = pd.DataFrame([p.model_dump() for p in prices])
@@ -284,7 +450,15 @@ def prices_to_df(prices: list[Price]) -> pd.DataFrame:
     return df
 
 
-# Update the get_price_data function to use the new functions
+def get_prices_df(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Fetch prices as a DataFrame built directly from the columnar cache, without per-row models.
+
+    The OHLC columns share the cache's read-only arrays, so the frame must not be modified
+    in place; use get_price_data for a frame of your own.
+    """
+    return _get_price_series(ticker, start_date, end_date).to_df()
+
+
 def get_price_data(ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-    prices = get_prices(ticker, start_date, end_date)
-    return prices_to_df(prices)
+    """Fetch prices as a writable DataFrame, copied from the cache."""
+    return get_prices_df(ticker, start_date, end_date).copy()
@@ -0,0 +1,188 @@
+"""Asyncio variants of the tools.api fetchers, for fetching many tickers concurrently.
+
+The fetchers run on worker threads over the shared pooled HTTP client and fill
+the same global cache as their synchronous counterparts, so anything fetched
+here is served locally to the agents afterwards.
+"""
+
+import asyncio
+import os
+
+from data.models import CompanyNews, FinancialMetrics, InsiderTrade, LineItem, Price
+from tools.api import (
+    get_company_news,
+    get_financial_metrics,
+    get_insider_trades,
+    get_market_cap,
+    get_prices,
+    search_line_items,
+)
+
+# Upper bound on requests in flight at once, unless FINANCIAL_DATASETS_MAX_CONCURRENCY or the caller sets one
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def max_concurrency_from_env() -> int:
+    """Read at call time so settings loaded from .env after import are honoured."""
+    return int(os.environ.get("FINANCIAL_DATASETS_MAX_CONCURRENCY") or DEFAULT_MAX_CONCURRENCY)
+
+
+async def aget_prices(ticker: str, start_date: str, end_date: str) -> list[Price]:
+    return await asyncio.to_thread(get_prices, ticker, start_date, end_date)
+
+
+async def aget_financial_metrics(ticker: str, end_date: str, period: str = "ttm", limit: int = 10) -> list[FinancialMetrics]:
+    return await asyncio.to_thread(get_financial_metrics, ticker, end_date, period, limit)
+
+
+async def asearch_line_items(ticker: str, line_items: list[str], end_date: str, period: str = "ttm", limit: int = 10) -> list[LineItem]:
+    return await asyncio.to_thread(search_line_items, ticker, line_items, end_date, period, limit)
+
+
+async def aget_insider_trades(ticker: str, end_date: str, start_date: str | None = None, limit: int = 1000) -> list[InsiderTrade]:
+    return await asyncio.to_thread(get_insider_trades, ticker, end_date, start_date, limit)
+
+
+async def aget_company_news(ticker: str, end_date: str, start_date: str | None = None, limit: int = 1000) -> list[CompanyNews]:
+    return await asyncio.to_thread(get_company_news, ticker, end_date, start_date, limit)
+
+
+async def aget_market_cap(ticker: str, end_date: str) -> float | None:
+    return await asyncio.to_thread(get_market_cap, ticker, end_date)
+
+
+# Endpoint name -> coroutine taking (ticker, start_date, end_date)
+PREFETCHERS = {
+    "prices": lambda ticker, start_date, end_date: aget_prices(ticker, start_date, end_date),
+    "financial_metrics": lambda ticker, start_date, end_date: aget_financial_metrics(ticker, end_date, limit=10),
+    "insider_trades": lambda ticker, start_date, end_date: aget_insider_trades(ticker, end_date, start_date=start_date, limit=1000),
+    "company_news": lambda ticker, start_date, end_date: aget_company_news(ticker, end_date, start_date=start_date, limit=1000),
+}
+
+
+async def aprefetch_many(
+    tickers: list[str],
+    endpoints: list[str] | dict[str, tuple[str, str]],
+    window: tuple[str, str] | None = None,
+    max_concurrency: int | None = None,
+) -> dict[tuple[str, str], Exception]:
+    """Fetch every (ticker, endpoint) pair concurrently into the shared cache.
+
+    `endpoints` is either a list of PREFETCHERS keys sharing one (start_date, end_date)
+    `window`, or a dict mapping each endpoint to its own window. Returns the errors
+    keyed by (ticker, endpoint) instead of raising, so one bad ticker does not
+    abort the rest.
+    """
+    windows = endpoints if isinstance(endpoints, dict) else {endpoint: window for endpoint in endpoints}
+    unknown = set(windows) - set(PREFETCHERS)
+    if unknown:
+        raise ValueError(f"Unknown endpoints: {sorted(unknown)}. Expected any of {sorted(PREFETCHERS)}")
+
+    semaphore = asyncio.Semaphore(max_concurrency or max_concurrency_from_env())
+    errors = {}
+
+    async def fetch(ticker: str, endpoint: str):
+        start_date, end_date = windows[endpoint]
+        async with semaphore:
+            try:
+                await PREFETCHERS[endpoint](ticker, start_date, end_date)
+            except Exception as e:
+                errors[(ticker, endpoint)] = e
+
+    await asyncio.gather(*(fetch(ticker, endpoint) for ticker in tickers for endpoint in windows))
+    return errors
+
+
+def prefetch_many(
+    tickers: list[str],
+    endpoints: list[str] | dict[str, tuple[str, str]],
+    window: tuple[str, str] | None = None,
+    max_concurrency: int | None = None,
+) -> dict[tuple[str, str], Exception]:
+    """Synchronous entry point for aprefetch_many. Must not be called from a running event loop."""
+    return asyncio.run(aprefetch_many(tickers, endpoints, window, max_concurrency))
+
+
+async def aprefetch_line_items(
+    tickers: list[str],
+    searches: list[dict[str, any]],
+    end_date: str,
+    max_concurrency: int | None = None,
+) -> dict[tuple[str, str], Exception]:
+    """Run each coalesced line item search (see utils.analysts.get_line_item_requests) once per ticker.
+
+    Returns the errors keyed by (ticker, period) instead of raising.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or max_concurrency_from_env())
+    errors = {}
+
+    async def fetch(ticker: str, search: dict[str, any]):
+        async with semaphore:
+            try:
+                await asearch_line_items(ticker, search["line_items"], end_date, search["period"], search["limit"])
+            except Exception as e:
+                errors[(ticker, search["period"])] = e
+
+    await asyncio.gather(*(fetch(ticker, search) for ticker in tickers for search in searches))
+    return errors
+
+
+def prefetch_line_items(
+    tickers: list[str],
+    searches: list[dict[str, any]],
+    end_date: str,
+    max_concurrency: int | None = None,
+) -> dict[tuple[str, str], Exception]:
+    """Synchronous entry point for aprefetch_line_items. Must not be called from a running event loop."""
+    return asyncio.run(aprefetch_line_items(tickers, searches, end_date, max_concurrency))
+
+
+async def aprefetch_plan(
+    tickers: list[str],
+    plan: dict[str, any],
+    max_concurrency: int | None = None,
+) -> dict[tuple[str, str], Exception]:
+    """Fetch everything in a data plan (see utils.analysts.get_data_plan) for every ticker in one batched pass.
+
+    Returns the errors keyed by (ticker, label) instead of raising, where the label is the
+    endpoint, followed by the period for financial metrics and line items.
+    """
+    end_date = plan["end_date"]
+    fetches = {}
+    if plan.get("prices"):
+        fetches["prices"] = lambda ticker, window=plan["prices"]: aget_prices(ticker, *window)
+    for endpoint, fetcher in (("insider_trades", aget_insider_trades), ("company_news", aget_company_news)):
+        if plan.get(endpoint):
+            fetches[endpoint] = lambda ticker, fetcher=fetcher, rows=plan[endpoint]: _fetch_in_order(fetcher, ticker, rows)
+    for metrics in plan.get("financial_metrics", []):
+        fetches[f"financial_metrics:{metrics['period']}"] = lambda ticker, metrics=metrics: aget_financial_metrics(ticker, end_date, metrics["period"], metrics["limit"])
+    for search in plan.get("line_items", []):
+        fetches[f"line_items:{search['period']}"] = lambda ticker, search=search: asearch_line_items(ticker, search["line_items"], end_date, search["period"], search["limit"])
+
+    semaphore = asyncio.Semaphore(max_concurrency or max_concurrency_from_env())
+    errors = {}
+
+    async def fetch(ticker: str, label: str):
+        async with semaphore:
+            try:
+                await fetches[label](ticker)
+            except Exception as e:
+                errors[(ticker, label)] = e
+
+    await asyncio.gather(*(fetch(ticker, label) for ticker in tickers for label in fetches))
+    return errors
+
+
+async def _fetch_in_order(fetcher, ticker: str, fetches: list[dict[str, any]]):
+    """Run a ticker's row fetches one after another, since each one's cache hit depends on the last."""
+    for fetch in fetches:
+        await fetcher(ticker, fetch["end_date"], start_date=fetch["start_date"], limit=fetch["limit"])
+
+
+def prefetch_plan(
+    tickers: list[str],
+    plan: dict[str, any],
+    max_concurrency: int | None = None,
+) -> dict[tuple[str, str], Exception]:
+    """Synchronous entry point for aprefetch_plan. Must not be called from a running event loop."""
+    return asyncio.run(aprefetch_plan(tickers, plan, max_concurrency))
@@ -0,0 +1,226 @@
+"""Shared HTTP client for the financial data API: pooled connections, retries and a per-host circuit breaker."""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from tools.key_pool import APIKeyPool
+from tools.rate_limiter import TokenBucket
+from tools.replay import get_recorder, request_key
+
+# Statuses worth retrying: rate limiting and transient server-side failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Response headers kept when recording; everything else is dropped to keep the archive small
+RECORDED_HEADERS = ("Content-Type", "Retry-After")
+
+
+class FinancialDataAPIError(Exception):
+    """Raised when the financial data API returns an error response."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(FinancialDataAPIError):
+    """Raised without sending a request while a host's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Stops sending requests to a host after repeated failures, then probes it again after a cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str):
+        """Raise CircuitOpenError if the circuit is open and the cool-down has not elapsed."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(f"Circuit open for {host} after {self._failures} consecutive failures; retry in {remaining:.1f}s")
+            # Half-open: let this request through as a probe; one more failure re-opens the circuit
+            self._opened_at = None
+            self._failures = self.failure_threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class HttpClient:
+    """Keep-alive session with bounded retries, exponential backoff with jitter and Retry-After support.
+
+    With a `rate_limiter` every attempt, retries included, first takes a token from it. With a
+    `key_pool` every attempt is sent with a key from the pool, and a rate limited key is benched
+    for the retry delay so that the retry can go out at once on another key.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 30.0,
+        pool_size: int = 20,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        rate_limiter: TokenBucket | None = None,
+        key_pool: APIKeyPool | None = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_limiter = rate_limiter
+        self.key_pool = key_pool
+
+        self.session = requests.Session()
+        # Retries are handled below so that backoff, Retry-After and the breaker see every attempt
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._breakers_lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+
+    def _retry_after(self, response: requests.Response) -> float | None:
+        """Parse a Retry-After header given either in seconds or as an HTTP date."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures.
+
+        Returns the final response, which may still carry an error status once
+        retries are exhausted; raises CircuitOpenError while the host is failing
+        and re-raises connection errors from the last attempt. In replay mode the
+        recorded response is returned instead (see tools.replay).
+        """
+        recorder = get_recorder()
+        if recorder.mode:
+            # Headers are left out of the key so recordings do not depend on API keys
+            key = request_key(method.upper(), url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+            if recorder.replaying:
+                return self._replayed_response(url, recorder.replay("http", key))
+        response = self._send(method, url, **kwargs)
+        if recorder.recording:
+            headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+            recorder.record("http", key, {"status_code": response.status_code, "headers": headers, "text": response.text})
+        return response
+
+    def _replayed_response(self, url: str, recorded: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response._content = recorded["text"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        host = urlparse(url).netloc
+        breaker = self._breaker(host)
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            breaker.before_request(host)
+            api_key = None
+            if self.key_pool:
+                api_key = self.key_pool.acquire()
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), self.key_pool.header: api_key}
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if api_key:
+                    self.key_pool.release(api_key)
+                breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                continue
+            if api_key:
+                self.key_pool.release(api_key, response.headers)
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                breaker.record_success()
+                return response
+
+            # Rate limiting means the host is healthy but busy; only server errors count against the breaker
+            if response.status_code != 429:
+                breaker.record_failure()
+            if attempt == self.max_retries:
+                return response
+
+            delay = self._retry_after(response)
+            delay = min(delay, self.backoff_max) if delay is not None else self._backoff(attempt)
+            if api_key and response.status_code == 429:
+                # The limit is per key: bench this one and let the pool wait only if no other key is free
+                self.key_pool.bench(api_key, delay)
+                continue
+            time.sleep(delay)
+
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+# Global client instance, created on first use so .env rate limit and API key settings are honoured
+_http_client: HttpClient | None = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the global HTTP client instance."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient(rate_limiter=TokenBucket.from_env(), key_pool=APIKeyPool.from_env())
+        return _http_client
@@ -0,0 +1,146 @@
+"""Pool of financial data API keys, so large prefetches can spread their requests over several quotas.
+
+Keys come from FINANCIAL_DATASETS_API_KEYS (comma-separated), falling back to the single
+FINANCIAL_DATASETS_API_KEY. Each request goes out on the key picked by the scheduling
+strategy; the key's remaining quota is read back from the response's rate limit headers,
+and a key that is rate limited or out of quota is benched until it is usable again.
+"""
+
+import itertools
+import os
+import threading
+import time
+
+from requests.structures import CaseInsensitiveDict
+
+LEAST_LOADED = "least_loaded"
+ROUND_ROBIN = "round_robin"
+
+# Rate limit headers read after each response, when the API sends them
+REMAINING_HEADER = "X-RateLimit-Remaining"
+LIMIT_HEADER = "X-RateLimit-Limit"
+RESET_HEADER = "X-RateLimit-Reset"
+
+# Reset values above this are epoch timestamps rather than seconds from now
+_EPOCH_THRESHOLD = 1_000_000_000
+
+
+class APIKey:
+    """Usage and quota state of one key."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.remaining: int | None = None
+        self.limit: int | None = None
+        self.benched_until = 0.0
+        self.last_used = 0.0
+
+    @property
+    def label(self) -> str:
+        """Masked key for logs and stats."""
+        return f"...{self.key[-4:]}" if len(self.key) > 4 else "..."
+
+
+class APIKeyPool:
+    """Schedules requests across API keys by least in-flight requests (then most remaining quota) or round-robin."""
+
+    def __init__(self, keys: list[str], strategy: str = LEAST_LOADED, header: str = "X-API-KEY"):
+        keys = list(dict.fromkeys(key for key in keys if key))
+        if not keys:
+            raise ValueError("An API key pool needs at least one key")
+        if strategy not in (LEAST_LOADED, ROUND_ROBIN):
+            raise ValueError(f"Unknown key scheduling strategy: {strategy!r}. Expected {LEAST_LOADED!r} or {ROUND_ROBIN!r}")
+        self.strategy = strategy
+        self.header = header
+        self._keys = {key: APIKey(key) for key in keys}
+        self._cycle = itertools.cycle(list(self._keys.values()))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "APIKeyPool | None":
+        """Build a pool from FINANCIAL_DATASETS_API_KEYS or FINANCIAL_DATASETS_API_KEY; None when neither is set."""
+        keys = [key.strip() for key in os.environ.get("FINANCIAL_DATASETS_API_KEYS", "").split(",") if key.strip()]
+        if not keys and (api_key := os.environ.get("FINANCIAL_DATASETS_API_KEY")):
+            keys = [api_key]
+        if not keys:
+            return None
+        return cls(keys, strategy=os.environ.get("FINANCIAL_DATASETS_API_KEY_STRATEGY") or LEAST_LOADED)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def acquire(self) -> str:
+        """Return the key to send the next request with, waiting if every key is benched."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                ready = [state for state in self._keys.values() if state.benched_until <= now]
+                if ready:
+                    state = self._pick(ready)
+                    state.in_flight += 1
+                    state.requests += 1
+                    state.last_used = now
+                    return state.key
+                wait = min(state.benched_until for state in self._keys.values()) - now
+            time.sleep(wait)
+
+    def _pick(self, ready: list[APIKey]) -> APIKey:
+        if self.strategy == ROUND_ROBIN:
+            ready_keys = {state.key for state in ready}
+            return next(state for state in self._cycle if state.key in ready_keys)
+        # Unknown quota sorts as plentiful, so fresh keys get used
+        return min(ready, key=lambda state: (state.in_flight, -(state.remaining if state.remaining is not None else float("inf")), state.last_used))
+
+    def release(self, key: str, headers: CaseInsensitiveDict | None = None):
+        """Mark a request on `key` finished and update its quota from the response headers, if any."""
+        with self._lock:
+            state = self._keys[key]
+            state.in_flight -= 1
+            if not headers:
+                return
+            if (remaining := _int_header(headers, REMAINING_HEADER)) is not None:
+                state.remaining = remaining
+            if (limit := _int_header(headers, LIMIT_HEADER)) is not None:
+                state.limit = limit
+            # Out of quota: bench the key until its window resets, if the API says when
+            if state.remaining == 0 and (reset := _int_header(headers, RESET_HEADER)) is not None:
+                reset_in = reset - time.time() if reset > _EPOCH_THRESHOLD else reset
+                state.benched_until = max(state.benched_until, time.monotonic() + max(0.0, reset_in))
+
+    def bench(self, key: str, seconds: float):
+        """Take a rate limited key out of rotation for `seconds`."""
+        with self._lock:
+            state = self._keys[key]
+            state.rate_limited += 1
+            state.benched_until = max(state.benched_until, time.monotonic() + seconds)
+
+    def available(self) -> int:
+        """Number of keys not currently benched."""
+        with self._lock:
+            now = time.monotonic()
+            return sum(1 for state in self._keys.values() if state.benched_until <= now)
+
+    def stats(self) -> dict[str, dict[str, any]]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                state.label: {
+                    "requests": state.requests,
+                    "in_flight": state.in_flight,
+                    "rate_limited": state.rate_limited,
+                    "remaining": state.remaining,
+                    "limit": state.limit,
+                    "benched_seconds": round(max(0.0, state.benched_until - now), 3),
+                }
+                for state in self._keys.values()
+            }
+
+
+def _int_header(headers: CaseInsensitiveDict, name: str) -> int | None:
+    try:
+        return int(float(headers[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
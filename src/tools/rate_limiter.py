@@ -0,0 +1,121 @@
+"""Token-bucket rate limiter pacing requests to the financial data API and the LLM providers.
+
+The bucket refills at ``rate`` tokens per second up to ``burst`` tokens and every
+request takes one, or its cost (e.g. its estimated LLM tokens). A request that finds
+the bucket empty reserves the tokens anyway and sleeps until they are due, so
+concurrent callers queue up in order and are spread evenly over time instead of
+bursting into 429s.
+
+With a state file the bucket is shared by every process using that file: its state
+is read and updated under an exclusive ``fcntl`` lock, so e.g. parallel backtests
+stay within one budget together.
+"""
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, buckets stay per process
+    fcntl = None
+
+
+class TokenBucket:
+    """Process-wide (optionally cross-process) token bucket with queue-time statistics."""
+
+    def __init__(self, rate: float, burst: float = 1.0, state_path: str | None = None):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.state_path = state_path if fcntl is not None else None
+        if state_path and self.state_path is None:
+            print(f"Warning: Cross-process rate limiting needs fcntl; limiting per process instead of through {state_path}")
+        if self.state_path:
+            directory = os.path.dirname(self.state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._tokens = self.burst
+        self._updated_at = time.time()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.delayed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @classmethod
+    def from_env(cls, prefix: str = "FINANCIAL_DATASETS_RATE_LIMIT") -> "TokenBucket | None":
+        """Build a bucket from ``<prefix>`` (requests per second), ``<prefix>_BURST`` and ``<prefix>_FILE``.
+
+        Returns None when ``<prefix>`` is unset or 0, i.e. requests are not paced.
+        """
+        rate = float(os.environ.get(prefix) or 0)
+        if rate <= 0:
+            return None
+        burst = float(os.environ.get(f"{prefix}_BURST") or rate)
+        state_path = os.environ.get(f"{prefix}_FILE")
+        return cls(rate, burst, os.path.expanduser(state_path) if state_path else None)
+
+    def acquire(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens, sleeping until they are available. Returns the time spent waiting in seconds."""
+        wait = self.reserve(cost)
+        # Sleep outside the lock; the tokens are already reserved so later callers queue behind them
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def reserve(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens without sleeping and return how long the caller must wait before using them.
+
+        For callers that wait their own way, e.g. with asyncio.sleep.
+        """
+        with self._lock:
+            if self.state_path:
+                wait = self._reserve_shared(cost)
+            else:
+                self._tokens, self._updated_at, wait = self._reserve(self._tokens, self._updated_at, cost)
+            self.acquired += 1
+            if wait > 0:
+                self.delayed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+        return wait
+
+    def _reserve(self, tokens: float, updated_at: float, cost: float) -> tuple[float, float, float]:
+        """Refill, take `cost` tokens and return the new (tokens, updated_at) and the wait until they are due."""
+        now = time.time()
+        # A negative balance is tokens already promised to waiting callers
+        tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate) - cost
+        return tokens, now, max(0.0, -tokens / self.rate)
+
+    def _reserve_shared(self, cost: float) -> float:
+        with open(self.state_path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    tokens, updated_at = (float(value) for value in f.read().split())
+                except ValueError:  # New or unreadable state file: start with a full bucket
+                    tokens, updated_at = self.burst, time.time()
+                tokens, updated_at, wait = self._reserve(tokens, updated_at, cost)
+                f.seek(0)
+                f.truncate()
+                f.write(f"{tokens!r} {updated_at!r}")
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    def stats(self) -> dict[str, float | int | None]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "state_path": self.state_path,
+                "acquired": self.acquired,
+                "delayed": self.delayed,
+                "total_wait_seconds": round(self.total_wait, 3),
+                "mean_wait_seconds": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+                "max_wait_seconds": round(self.max_wait, 3),
+            }
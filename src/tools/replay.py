@@ -0,0 +1,123 @@
+"""Record/replay of data API and LLM responses, for repeatable offline runs.
+
+With ``REPLAY_MODE=record`` every data API response and every LLM answer of a run is
+written to a gzipped JSON-lines archive (``REPLAY_ARCHIVE``, default
+``.cache/replay.jsonl.gz``). With ``REPLAY_MODE=replay`` they are served back from
+that archive without touching the network, optionally delayed by
+``REPLAY_LATENCY_MS`` (and ``REPLAY_LLM_LATENCY_MS`` for LLM calls) to mimic the
+live services. Requests missing from the archive raise ReplayMissError.
+"""
+
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class ReplayMissError(LookupError):
+    """Raised in replay mode for a request that was not recorded."""
+
+
+def request_key(*parts) -> str:
+    """Stable hash of the JSON-serialisable parts identifying a request."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode()).hexdigest()
+
+
+class Recorder:
+    """Appends recorded entries to, or serves them back from, a gzipped JSON-lines archive.
+
+    Each line is ``{"kind", "key", "value"}``. A key recorded several times is replayed
+    in recording order, and its last value is repeated once the others are used up.
+    """
+
+    def __init__(self, mode: str | None, path: str, latency_seconds: float = 0.0, llm_latency_seconds: float | None = None):
+        if mode not in (None, RECORD, REPLAY):
+            raise ValueError(f"Unknown replay mode: {mode!r}. Expected {RECORD!r} or {REPLAY!r}")
+        self.mode = mode
+        self.path = path
+        self.latency_seconds = latency_seconds
+        self.llm_latency_seconds = latency_seconds if llm_latency_seconds is None else llm_latency_seconds
+        self._lock = threading.Lock()
+        self._file = None
+        self._entries: dict[tuple[str, str], deque] | None = None
+
+    @classmethod
+    def from_env(cls) -> "Recorder":
+        llm_latency_ms = os.environ.get("REPLAY_LLM_LATENCY_MS")
+        return cls(
+            os.environ.get("REPLAY_MODE") or None,
+            os.path.expanduser(os.environ.get("REPLAY_ARCHIVE", os.path.join(".cache", "replay.jsonl.gz"))),
+            latency_seconds=float(os.environ.get("REPLAY_LATENCY_MS", "0")) / 1000,
+            llm_latency_seconds=float(llm_latency_ms) / 1000 if llm_latency_ms else None,
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    def record(self, kind: str, key: str, value):
+        """Append an entry to the archive, starting a fresh archive on the first write of the run."""
+        line = json.dumps({"kind": kind, "key": key, "value": value}, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = gzip.open(self.path, "wt", encoding="utf-8")
+                atexit.register(self.close)
+            self._file.write(line + "\n")
+
+    def replay(self, kind: str, key: str):
+        """Return the next recorded value for (kind, key) after the configured latency."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read_archive()
+            values = self._entries.get((kind, key))
+            if not values:
+                raise ReplayMissError(f"No recorded {kind} response for request {key[:12]} in {self.path}")
+            value = values.popleft() if len(values) > 1 else values[0]
+        delay = self.llm_latency_seconds if kind == "llm" else self.latency_seconds
+        if delay:
+            time.sleep(delay)
+        return value
+
+    def _read_archive(self) -> dict[tuple[str, str], deque]:
+        entries = defaultdict(deque)
+        if not os.path.exists(self.path):
+            raise ReplayMissError(f"Replay archive {self.path} does not exist; record one first with REPLAY_MODE={RECORD}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                entries[(entry["kind"], entry["key"])].append(entry["value"])
+        return entries
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Global recorder, configured from the environment on first use so .env settings are honoured
+_recorder: Recorder | None = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Recorder:
+    """Get the global recorder instance."""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = Recorder.from_env()
+        return _recorder
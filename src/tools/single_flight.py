@@ -0,0 +1,65 @@
+"""Single-flight deduplication: concurrent identical calls share one execution."""
+
+import functools
+import inspect
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; callers arriving meanwhile wait for its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: dict[any, Future] = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs), or wait for the identical call already in flight under `key`."""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+def _freeze(value):
+    """Make list arguments (e.g. line item names) usable in a dict key."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def single_flight(fn):
+    """Decorator deduplicating concurrent calls with equal arguments.
+
+    Every caller receives its own shallow copy of a list result, so one caller
+    reordering or trimming the list does not affect the others.
+    """
+    group = SingleFlight()
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # Bind to the signature so positional, keyword and defaulted spellings of a call share a key
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple((name, _freeze(value)) for name, value in bound.arguments.items())
+        result = group.do(key, fn, *args, **kwargs)
+        return list(result) if isinstance(result, list) else result
+
+    return wrapper
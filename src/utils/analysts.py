@@ -1,85 +1,170 @@
 """Constants and utilities related to analysts configuration."""
 
-from agents.ben_graham import ben_graham_agent
-from agents.bill_ackman import bill_ackman_agent
-from agents.cathie_wood import cathie_wood_agent
-from agents.charlie_munger import charlie_munger_agent
+import math
+from datetime import date, timedelta
+
+
+from agents.ben_graham import ben_graham_agent, LINE_ITEM_REQUEST as BEN_GRAHAM_LINE_ITEM_REQUEST
+from agents.bill_ackman import bill_ackman_agent, LINE_ITEM_REQUEST as BILL_ACKMAN_LINE_ITEM_REQUEST
+from agents.cathie_wood import cathie_wood_agent, LINE_ITEM_REQUEST as CATHIE_WOOD_LINE_ITEM_REQUEST
+from agents.charlie_munger import charlie_munger_agent, LINE_ITEM_REQUEST as CHARLIE_MUNGER_LINE_ITEM_REQUEST
 from agents.fundamentals import fundamentals_agent
-from agents.michael_burry import michael_burry_agent
-from agents.phil_fisher import phil_fisher_agent
-from agents.peter_lynch import peter_lynch_agent
+from agents.michael_burry import michael_burry_agent, LINE_ITEM_REQUEST as MICHAEL_BURRY_LINE_ITEM_REQUEST
+from agents.phil_fisher import phil_fisher_agent, LINE_ITEM_REQUEST as PHIL_FISHER_LINE_ITEM_REQUEST
+from agents.peter_lynch import peter_lynch_agent, LINE_ITEM_REQUEST as PETER_LYNCH_LINE_ITEM_REQUEST
 from agents.sentiment import sentiment_agent
-from agents.stanley_druckenmiller import stanley_druckenmiller_agent
+from agents.stanley_druckenmiller import stanley_druckenmiller_agent, LINE_ITEM_REQUEST as STANLEY_DRUCKENMILLER_LINE_ITEM_REQUEST
 from agents.technicals import technical_analyst_agent
-from agents.valuation import valuation_agent
-from agents.warren_buffett import warren_buffett_agent
+from agents.valuation import valuation_agent, LINE_ITEM_REQUEST as VALUATION_LINE_ITEM_REQUEST
+from agents.warren_buffett import warren_buffett_agent, LINE_ITEM_REQUEST as WARREN_BUFFETT_LINE_ITEM_REQUEST
+from tools.api import MAX_PAGE_SIZE
 
-# Define analyst configuration - single source of truth
+# Define analyst configuration - single source of truth.
+# "data_requirements" declares what each agent reads per ticker, so the data planner can prefetch it:
+#   prices:                 {} = the run's window; {"lookback_days": n} = n days back from the end date
+#   financial_metrics:      the period and limit of the agent's get_financial_metrics call
+#   line_items:             the agent's LINE_ITEM_REQUEST, the {"line_items", "period", "limit"} of its
+#                           search_line_items call, defined next to that call in the agent's module
+#   market_cap:             {} if the agent calls get_market_cap
+#   insider_trades / news:  {"lookback_days": n} if the agent reads every row from n days before the end date,
+#                           {"limit": n} if it reads the newest n rows up to the end date (start_date=None)
 ANALYST_CONFIG = {
     "ben_graham": {
         "display_name": "Ben Graham",
         "agent_func": ben_graham_agent,
         "order": 0,
+        "data_requirements": {
+            "financial_metrics": {"period": "annual", "limit": 10},
+            "line_items": BEN_GRAHAM_LINE_ITEM_REQUEST,
+            "market_cap": {},
+        },
     },
     "bill_ackman": {
         "display_name": "Bill Ackman",
         "agent_func": bill_ackman_agent,
         "order": 1,
+        "data_requirements": {
+            "financial_metrics": {"period": "annual", "limit": 5},
+            "line_items": BILL_ACKMAN_LINE_ITEM_REQUEST,
+            "market_cap": {},
+        },
     },
     "cathie_wood": {
         "display_name": "Cathie Wood",
         "agent_func": cathie_wood_agent,
         "order": 2,
+        "data_requirements": {
+            "financial_metrics": {"period": "annual", "limit": 5},
+            "line_items": CATHIE_WOOD_LINE_ITEM_REQUEST,
+            "market_cap": {},
+        },
     },
     "charlie_munger": {
         "display_name": "Charlie Munger",
         "agent_func": charlie_munger_agent,
         "order": 3,
+        "data_requirements": {
+            "financial_metrics": {"period": "annual", "limit": 10},
+            "line_items": CHARLIE_MUNGER_LINE_ITEM_REQUEST,
+            "market_cap": {},
+            "insider_trades": {"limit": 100},
+            "company_news": {"limit": 100},
+        },
     },
     "michael_burry": {
         "display_name": "Michael Burry",
         "agent_func": michael_burry_agent,
         "order": 4,
+        "data_requirements": {
+            "financial_metrics": {"period": "ttm", "limit": 5},
+            "line_items": MICHAEL_BURRY_LINE_ITEM_REQUEST,
+            "market_cap": {},
+            "insider_trades": {"lookback_days": 365},
+            "company_news": {"lookback_days": 365},
+        },
     },
     "peter_lynch": {
         "display_name": "Peter Lynch",
         "agent_func": peter_lynch_agent,
         "order": 5,
+        "data_requirements": {
+            "prices": {},
+            "financial_metrics": {"period": "annual", "limit": 5},
+            "line_items": PETER_LYNCH_LINE_ITEM_REQUEST,
+            "market_cap": {},
+            "insider_trades": {"limit": 50},
+            "company_news": {"limit": 50},
+        },
     },
     "phil_fisher": {
         "display_name": "Phil Fisher",
         "agent_func": phil_fisher_agent,
         "order": 6,
+        "data_requirements": {
+            "financial_metrics": {"period": "annual", "limit": 5},
+            "line_items": PHIL_FISHER_LINE_ITEM_REQUEST,
+            "market_cap": {},
+            "insider_trades": {"limit": 50},
+            "company_news": {"limit": 50},
+        },
     },
     "stanley_druckenmiller": {
         "display_name": "Stanley Druckenmiller",
         "agent_func": stanley_druckenmiller_agent,
         "order": 7,
+        "data_requirements": {
+            "prices": {},
+            "financial_metrics": {"period": "annual", "limit": 5},
+            "line_items": STANLEY_DRUCKENMILLER_LINE_ITEM_REQUEST,
+            "market_cap": {},
+            "insider_trades": {"limit": 50},
+            "company_news": {"limit": 50},
+        },
     },
     "warren_buffett": {
         "display_name": "Warren Buffett",
         "agent_func": warren_buffett_agent,
         "order": 8,
+        "data_requirements": {
+            "financial_metrics": {"period": "ttm", "limit": 5},
+            "line_items": WARREN_BUFFETT_LINE_ITEM_REQUEST,
+            "market_cap": {},
+        },
     },
     "technical_analyst": {
         "display_name": "Technical Analyst",
         "agent_func": technical_analyst_agent,
         "order": 9,
+        "data_requirements": {
+            "prices": {},
+        },
     },
     "fundamentals_analyst": {
         "display_name": "Fundamentals Analyst",
         "agent_func": fundamentals_agent,
         "order": 10,
+        "data_requirements": {
+            "financial_metrics": {"period": "ttm", "limit": 10},
+        },
     },
     "sentiment_analyst": {
         "display_name": "Sentiment Analyst",
         "agent_func": sentiment_agent,
         "order": 11,
+        "data_requirements": {
+            "insider_trades": {"limit": 1000},
+            "company_news": {"limit": 100},
+        },
     },
     "valuation_analyst": {
         "display_name": "Valuation Analyst",
         "agent_func": valuation_agent,
         "order": 12,
+        "data_requirements": {
+            "financial_metrics": {"period": "ttm", "limit": 10},
+            "line_items": VALUATION_LINE_ITEM_REQUEST,
+            "market_cap": {},
+        },
     },
 }
 
@@ -90,3 +175,97 @@ ANALYST_ORDER = [(config["display_name"], key) for key, config in sorted(ANALYST
 def get_analyst_nodes():
     """Get the mapping of analyst keys to their (node_name, agent_func) tuples."""
     return {key: (f"{key}_agent", config["agent_func"]) for key, config in ANALYST_CONFIG.items()}
+
+
+# Data read on every run whatever the roster: the risk manager and the backtester need prices for the window
+BASE_DATA_REQUIREMENTS = {"prices": {}}
+
+# Reports published per year for each period, used to widen fetches so they cover a whole backtest
+REPORTS_PER_YEAR = {"annual": 1, "ttm": 4, "quarterly": 4}
+
+
+def _data_requirements(analyst_keys: list[str]) -> list[dict[str, any]]:
+    configs = (ANALYST_CONFIG.get(key.removesuffix("_agent"), {}) for key in analyst_keys)
+    return [config["data_requirements"] for config in configs if config.get("data_requirements")]
+
+
+def _reports_in_span(period: str, first_end_date: str, end_date: str) -> int:
+    """Upper bound on the reports published between two end dates."""
+    years = (date.fromisoformat(end_date) - date.fromisoformat(first_end_date)).days / 365
+    return math.ceil(years * REPORTS_PER_YEAR.get(period, 4)) + 1 if years > 0 else 0
+
+
+def get_line_item_requests(analyst_keys: list[str], first_end_date: str | None = None, end_date: str | None = None) -> list[dict[str, any]]:
+    """Coalesce the line item searches declared by the given analysts into one search per period.
+
+    Each coalesced search asks for the union of the analysts' line items with the largest limit,
+    so every analyst's own search_line_items call can then be served from the cache. If the
+    analysts run for every end date from `first_end_date` to `end_date`, the limit is widened by
+    the reports published in between, so one search ending at `end_date` serves all of them.
+    """
+    coalesced = {}
+    for requirements in _data_requirements(analyst_keys):
+        if not (request := requirements.get("line_items")):
+            continue
+        search = coalesced.setdefault(request["period"], {"line_items": set(), "period": request["period"], "limit": 0})
+        search["line_items"].update(request["line_items"])
+        search["limit"] = max(search["limit"], request["limit"])
+    if first_end_date and end_date:
+        for search in coalesced.values():
+            search["limit"] += _reports_in_span(search["period"], first_end_date, end_date)
+    return [{**search, "line_items": sorted(search["line_items"])} for search in coalesced.values()]
+
+
+def get_data_plan(analyst_keys: list[str], start_date: str, end_date: str, first_end_date: str | None = None) -> dict[str, any]:
+    """Compute the union of the data the given analysts read over a run, for tools.async_api.prefetch_plan.
+
+    The analysts are invoked with end dates from `first_end_date` (default: `end_date`) to
+    `end_date`, and `start_date` is the earliest start date any invocation receives. Metric and
+    line item limits are widened to cover every end date in that span (see get_line_item_requests).
+
+    Returns a dict with the end date, a (start, end) window for prices (None if no analyst
+    reads them), the insider trades and company news fetches as {"start_date", "end_date",
+    "limit"} in the order they must run, the financial metrics fetches as {"period", "limit"}
+    and the coalesced line item searches.
+    """
+    first_end_date = first_end_date or end_date
+    requirements = [BASE_DATA_REQUIREMENTS] + _data_requirements(analyst_keys)
+
+    def window(endpoint: str) -> tuple[str, str] | None:
+        starts = []
+        for requirement in requirements:
+            if (spec := requirement.get(endpoint)) is None:
+                continue
+            lookback_days = spec.get("lookback_days")
+            starts.append(start_date if lookback_days is None else (date.fromisoformat(first_end_date) - timedelta(days=lookback_days)).isoformat())
+        return (min(starts), end_date) if starts else None
+
+    def row_fetches(endpoint: str) -> list[dict[str, any]]:
+        specs = [requirement[endpoint] for requirement in requirements if endpoint in requirement]
+        limits = [spec["limit"] for spec in specs if "lookback_days" not in spec]
+        starts = [(date.fromisoformat(first_end_date) - timedelta(days=spec["lookback_days"])).isoformat() for spec in specs if "lookback_days" in spec]
+        if limits and first_end_date < end_date:
+            # Rows after the first end date are read by the later end dates of a backtest
+            starts.append((date.fromisoformat(first_end_date) + timedelta(days=1)).isoformat())
+        # The window runs first: the cache serves any read that finds rows in its range, so
+        # a limit fetch that ran first would make the window look fetched already
+        fetches = [{"start_date": min(starts), "end_date": end_date, "limit": MAX_PAGE_SIZE}] if starts else []
+        if limits:
+            fetches.append({"start_date": None, "end_date": first_end_date, "limit": max(limits)})
+        return fetches
+
+    # get_market_cap reads the default TTM metrics
+    metric_limits = {}
+    for requirement in requirements:
+        for spec in (requirement.get("financial_metrics"), {"period": "ttm", "limit": 10} if "market_cap" in requirement else None):
+            if spec:
+                metric_limits[spec["period"]] = max(metric_limits.get(spec["period"], 0), spec["limit"])
+
+    return {
+        "end_date": end_date,
+        "prices": window("prices"),
+        "insider_trades": row_fetches("insider_trades"),
+        "company_news": row_fetches("company_news"),
+        "financial_metrics": [{"period": period, "limit": limit + _reports_in_span(period, first_end_date, end_date)} for period, limit in metric_limits.items()],
+        "line_items": get_line_item_requests(analyst_keys, first_end_date, end_date),
+    }
@@ -1,12 +1,108 @@
 """Helper functions for LLM"""
 
+import asyncio
 import json
-from typing import TypeVar, Type, Optional, Any
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import TypeVar, Type, Optional, Any, Coroutine
 from pydantic import BaseModel
+from data.disk_store import DiskStore
+from tools.rate_limiter import TokenBucket
+from tools.replay import get_recorder, request_key
 from utils.progress import progress
 
 T = TypeVar('T', bound=BaseModel)
 
+# Persistent cache of LLM answers, configured from LLM_CACHE_DIR / _TTL_HOURS / _MAX_MB on first use
+_response_cache: DiskStore | None = None
+_response_cache_configured = False
+_response_cache_lock = threading.Lock()
+
+def get_llm_cache() -> DiskStore | None:
+    """Get the persistent LLM response cache, or None when LLM_CACHE_DIR is unset."""
+    global _response_cache, _response_cache_configured
+    with _response_cache_lock:
+        if not _response_cache_configured:
+            _response_cache = DiskStore.from_env("llm_responses.sqlite3", prefix="LLM_CACHE")
+            _response_cache_configured = True
+        return _response_cache
+
+# Rough prompt size in tokens for the per-minute token budgets, plus an allowance for the answer
+CHARS_PER_TOKEN = 4
+ANSWER_TOKEN_ESTIMATE = 500
+
+# Backoff between checks for a free concurrency slot in acall_llm
+SLOT_POLL_MIN_SECONDS = 0.005
+SLOT_POLL_MAX_SECONDS = 0.1
+
+class ProviderLimiter:
+    """Enforces a provider's PROVIDER_LIMITS (see llm.models) for both call_llm and acall_llm.
+
+    The per-minute budgets are token buckets and the concurrency cap is one thread semaphore,
+    all shared process-wide: coroutines on any event loop and plain threads draw on the same
+    slots, so parallel agents each running their own loop cannot multiply the cap.
+    """
+
+    def __init__(self, max_concurrency: int | None, requests_per_minute: int | None, tokens_per_minute: int | None):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+    def budget_wait(self, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens, returning how long to wait before sending."""
+        waits = [self.requests.reserve() if self.requests else 0.0, self.tokens.reserve(tokens) if self.tokens else 0.0]
+        return max(waits)
+
+    @contextmanager
+    def slot(self, tokens: int):
+        if self._slots:
+            self._slots.acquire()
+        try:
+            if (wait := self.budget_wait(tokens)) > 0:
+                time.sleep(wait)
+            yield
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int):
+        if self._slots:
+            # Poll the shared semaphore from the event loop: blocking an executor thread per
+            # waiter would leave none for the slot holders' own executor work (e.g. LangChain's
+            # output parsing), so they could never finish and release their slots
+            delay = SLOT_POLL_MIN_SECONDS
+            while not self._slots.acquire(blocking=False):
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, SLOT_POLL_MAX_SECONDS)
+        try:
+            if (wait := self.budget_wait(tokens)) > 0:
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            if self._slots:
+                self._slots.release()
+
+_limiters: dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_provider_limiter(model_provider: str) -> ProviderLimiter:
+    """Get the shared limiter for a provider, configured from llm.models.PROVIDER_LIMITS on first use."""
+    from llm.models import ModelProvider, get_provider_limits
+
+    model_provider = ModelProvider(model_provider)
+    with _limiters_lock:
+        if model_provider not in _limiters:
+            _limiters[model_provider] = ProviderLimiter(**get_provider_limits(model_provider))
+        return _limiters[model_provider]
+
+def estimate_tokens(prompt: Any) -> int:
+    """Rough token count of a prompt and its answer, for the per-minute token budgets."""
+    return len(json.dumps(prompt_to_json(prompt))) // CHARS_PER_TOKEN + ANSWER_TOKEN_ESTIMATE
+
 def call_llm(
     prompt: Any,
     model_name: str,
@@ -14,10 +110,16 @@ def call_llm(
     pydantic_model: Type[T],
     agent_name: Optional[str] = None,
     max_retries: int = 3,
-    default_factory = None
+    default_factory = None,
+    use_cache: bool = True,
 ) -> T:
     """
     Makes an LLM call with retry logic, handling both Deepseek and non-Deepseek models.
+
+    Answers are cached on disk (see get_llm_cache) keyed by model, provider, prompt messages
+    and output schema, so an identical prompt is only paid for once per TTL. Fallback answers
+    after failed calls are never cached. Every attempt waits for the provider's concurrency
+    and per-minute budgets (see get_provider_limiter).
     
     Args:
         prompt: The prompt to send to the LLM
@@ -27,49 +129,183 @@ def call_llm(
         agent_name: Optional name of the agent for progress updates
         max_retries: Maximum number of retries (default: 3)
         default_factory: Optional factory function to create default response on failure
+        use_cache: Set to False (or set LLM_CACHE_BYPASS=1) to skip cached answers; the fresh answer is still cached
         
     Returns:
         An instance of the specified Pydantic model
     """
-    from llm.models import get_model, get_model_info
-    
+    key, result = _lookup_answer(prompt, model_name, model_provider, pydantic_model, use_cache)
+    if result is None:
+        # Raises for a missing API key rather than falling back to a default answer
+        llm, extract_json = _get_llm(model_name, model_provider, pydantic_model)
+        try:
+            result = _call_llm_with_retries(prompt, llm, extract_json, model_provider, pydantic_model, agent_name, max_retries)
+        except Exception as e:
+            print(f"Error in LLM call after {max_retries} attempts: {e}")
+            # Use default_factory if provided, otherwise create a basic default
+            result = default_factory() if default_factory else create_default_response(pydantic_model)
+        else:
+            _cache_answer(key, result)
+    _record_answer(key, result)
+    return result
+
+async def acall_llm(
+    prompt: Any,
+    model_name: str,
+    model_provider: str,
+    pydantic_model: Type[T],
+    agent_name: Optional[str] = None,
+    max_retries: int = 3,
+    default_factory = None,
+    use_cache: bool = True,
+) -> T:
+    """Async variant of call_llm using ainvoke, so many prompts can be in flight at once within the provider's budgets.
+
+    Takes the same arguments as call_llm and shares its response cache, record/replay and limits.
+    """
+    # Cache reads and replay delays block, so they run on a worker thread
+    key, result = await asyncio.to_thread(_lookup_answer, prompt, model_name, model_provider, pydantic_model, use_cache)
+    if result is None:
+        llm, extract_json = _get_llm(model_name, model_provider, pydantic_model)
+        try:
+            result = await _acall_llm_with_retries(prompt, llm, extract_json, model_provider, pydantic_model, agent_name, max_retries)
+        except Exception as e:
+            print(f"Error in LLM call after {max_retries} attempts: {e}")
+            result = default_factory() if default_factory else create_default_response(pydantic_model)
+        else:
+            await asyncio.to_thread(_cache_answer, key, result)
+    _record_answer(key, result)
+    return result
+
+# Long-lived event loop that runs acall_llm prompts for synchronous callers (see run_llm_calls)
+_llm_loop: asyncio.AbstractEventLoop | None = None
+_llm_loop_lock = threading.Lock()
+
+def run_llm_calls(calls: list[Coroutine[Any, Any, T]]) -> list[T]:
+    """Run acall_llm coroutines concurrently from synchronous code and return their results in order.
+
+    They all run on one shared background event loop, so agents on several threads need no
+    loop of their own; the provider limits still bound how many prompts are in flight.
+    """
+    global _llm_loop
+    with _llm_loop_lock:
+        if _llm_loop is None:
+            _llm_loop = asyncio.new_event_loop()
+            threading.Thread(target=_llm_loop.run_forever, name="llm-event-loop", daemon=True).start()
+        loop = _llm_loop
+
+    async def gather() -> list[T]:
+        return list(await asyncio.gather(*calls))
+
+    return asyncio.run_coroutine_threadsafe(gather(), loop).result()
+
+def _lookup_answer(prompt: Any, model_name: str, model_provider: str, pydantic_model: Type[T], use_cache: bool) -> tuple[str | None, T | None]:
+    """Return the request key and the replayed or cached answer, if any."""
+    # Answers are keyed by model, schema and prompt, both in the cache and in record/replay mode (see tools.replay)
+    recorder = get_recorder()
+    cache = get_llm_cache()
+    if not (recorder.mode or cache):
+        return None, None
+    key = request_key(model_name, model_provider, pydantic_model.model_json_schema(), prompt_to_json(prompt))
+    if recorder.replaying:
+        return key, pydantic_model.model_validate(recorder.replay("llm", key))
+    if cache and use_cache and os.environ.get("LLM_CACHE_BYPASS", "").lower() not in ("1", "true", "yes"):
+        if (cached := cache.load("llm", key)) is not None:
+            return key, pydantic_model.model_validate(cached)
+    return key, None
+
+def _cache_answer(key: str | None, result: BaseModel):
+    """Store a fresh answer; a failed write is logged and never costs the caller the answer."""
+    if key and (cache := get_llm_cache()):
+        try:
+            cache.save("llm", key, result.model_dump(mode="json"))
+        except Exception as e:
+            print(f"Warning: Failed to cache LLM answer: {e}")
+
+def _record_answer(key: str | None, result: BaseModel):
+    if key and (recorder := get_recorder()).recording:
+        recorder.record("llm", key, result.model_dump(mode="json"))
+
+def _get_llm(model_name: str, model_provider: str, pydantic_model: Type[T]):
+    """Return the shared client for a call and whether its answers need manual JSON extraction."""
+    from llm.models import get_model, get_model_info, get_structured_model
+
     model_info = get_model_info(model_name)
-    llm = get_model(model_name, model_provider)
-    
-    # For non-JSON support models, we can use structured output
+    # For non-JSON support models, we can use structured output; clients and wrappers are shared across calls
     if not (model_info and not model_info.has_json_mode()):
-        llm = llm.with_structured_output(
-            pydantic_model,
-            method="json_mode",
-        )
+        return get_structured_model(model_name, model_provider, pydantic_model, method="json_mode"), False
+    return get_model(model_name, model_provider), True
+
+def _parse_answer(result: Any, pydantic_model: Type[T], extract_json: bool) -> T:
+    # For non-JSON support models, we need to extract and parse the JSON manually
+    if not extract_json:
+        return result
+    parsed_result = extract_json_from_deepseek_response(result.content)
+    if parsed_result:
+        return pydantic_model(**parsed_result)
+    raise ValueError("No JSON found in the model's response")
+
+def _call_llm_with_retries(
+    prompt: Any,
+    llm: Any,
+    extract_json: bool,
+    model_provider: str,
+    pydantic_model: Type[T],
+    agent_name: Optional[str],
+    max_retries: int,
+) -> T:
+    """Calls the LLM up to max_retries times, raising the last error if no attempt gives a parsed answer."""
+    limiter = get_provider_limiter(model_provider)
+    tokens = estimate_tokens(prompt)
     
     # Call the LLM with retries
     for attempt in range(max_retries):
         try:
-            # Call the LLM
-            result = llm.invoke(prompt)
-            
-            # For non-JSON support models, we need to extract and parse the JSON manually
-            if model_info and not model_info.has_json_mode():
-                parsed_result = extract_json_from_deepseek_response(result.content)
-                if parsed_result:
-                    return pydantic_model(**parsed_result)
-            else:
-                return result
-                
-        except Exception as e:
+            with limiter.slot(tokens):
+                result = llm.invoke(prompt)
+            return _parse_answer(result, pydantic_model, extract_json)
+        except Exception:
             if agent_name:
                 progress.update_status(agent_name, None, f"Error - retry {attempt + 1}/{max_retries}")
             
             if attempt == max_retries - 1:
-                print(f"Error in LLM call after {max_retries} attempts: {e}")
-                # Use default_factory if provided, otherwise create a basic default
-                if default_factory:
-                    return default_factory()
-                return create_default_response(pydantic_model)
-
-    # This should never be reached due to the retry logic above
-    return create_default_response(pydantic_model)
+                raise
+
+    # Only reached when max_retries < 1
+    raise ValueError(f"No LLM call made with max_retries={max_retries}")
+
+async def _acall_llm_with_retries(
+    prompt: Any,
+    llm: Any,
+    extract_json: bool,
+    model_provider: str,
+    pydantic_model: Type[T],
+    agent_name: Optional[str],
+    max_retries: int,
+) -> T:
+    """Async counterpart of _call_llm_with_retries."""
+    limiter = get_provider_limiter(model_provider)
+    tokens = estimate_tokens(prompt)
+
+    for attempt in range(max_retries):
+        try:
+            async with limiter.aslot(tokens):
+                result = await llm.ainvoke(prompt)
+            return _parse_answer(result, pydantic_model, extract_json)
+        except Exception:
+            if agent_name:
+                progress.update_status(agent_name, None, f"Error - retry {attempt + 1}/{max_retries}")
+
+            if attempt == max_retries - 1:
+                raise
+
+    raise ValueError(f"No LLM call made with max_retries={max_retries}")
+
+def prompt_to_json(prompt: Any) -> Any:
+    """Converts a prompt into a JSON-serialisable form, e.g. for keying recorded responses."""
+    if hasattr(prompt, "to_messages"):
+        return [[message.type, message.content] for message in prompt.to_messages()]
+    return str(prompt)
 
 def create_default_response(model_class: Type[T]) -> T:
     """Creates a safe default response based on the model's fields."""
@@ -0,0 +1,170 @@
+"""Optional batched mode for the persona agents: one structured LLM call covering many tickers.
+
+By default each persona asks the LLM for one ticker at a time. With PERSONA_BATCH=1 it sends
+the compact analysis of all its tickers in one prompt and gets a signal per ticker back, the
+way portfolio_manager.generate_trading_decision does. The persona's own system prompt is
+reused without its single-ticker output format. Tickers are split into several prompts
+when their analysis would exceed PERSONA_BATCH_MAX_TOKENS, and any ticker missing from a
+batched answer is asked for again on its own.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Type, TypeVar
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel, Field, create_model
+
+from utils.llm import ANSWER_TOKEN_ESTIMATE, CHARS_PER_TOKEN, acall_llm, run_llm_calls
+from utils.progress import progress
+
+T = TypeVar("T", bound=BaseModel)
+
+# Prompt tokens allowed per batched call before the tickers are split over several calls
+DEFAULT_MAX_BATCH_TOKENS = 8000
+
+BATCH_HUMAN_TEMPLATE = """Based on the following data, create the investment signal for each ticker as instructed above.
+
+Analysis Data by ticker:
+{analysis_data}
+
+Return one signal for each of these tickers: {tickers}, in the following JSON format exactly:
+{{
+  "signals": {{
+    "<ticker>": {{
+      "signal": "bullish" | "bearish" | "neutral",
+      "confidence": float between 0 and 100,
+      "reasoning": "string"
+    }}
+  }}
+}}
+"""
+
+# Replaces the single-object output instructions some persona system prompts end with
+BATCH_FORMAT_NOTE = "You will be given several tickers at once. Give a separate signal, confidence and reasoning for each ticker, in the JSON format stated in the request."
+
+# A line asking for a JSON answer, e.g. "Return your final output strictly in JSON with the fields:"
+_JSON_INSTRUCTION = re.compile(r"\b(output|return)\b.*\bJSON\b", re.IGNORECASE)
+
+# Batched output model per persona signal model
+_batch_models: dict[type, type] = {}
+_batch_models_lock = threading.Lock()
+
+
+def batching_enabled() -> bool:
+    return os.environ.get("PERSONA_BATCH", "").lower() in ("1", "true", "yes")
+
+
+def batch_model(signal_model: Type[T]) -> type[BaseModel]:
+    """The structured output for a batched call: {"signals": {ticker: signal_model}}."""
+    with _batch_models_lock:
+        if signal_model not in _batch_models:
+            _batch_models[signal_model] = create_model(
+                f"{signal_model.__name__}Batch",
+                signals=(dict[str, signal_model], Field(description="Dictionary of ticker to signal")),
+            )
+        return _batch_models[signal_model]
+
+
+def strip_output_format(instructions: str) -> str:
+    """Drop the single-ticker JSON output instructions from a persona's system prompt.
+
+    Removes each line asking for a JSON answer together with the example object or the
+    field bullets that follow it, so they cannot contradict the batched format.
+    """
+    kept, skipping = [], None
+    for line in instructions.split("\n"):
+        stripped = line.strip()
+        if skipping == "object":
+            if stripped.startswith("}"):
+                skipping = None
+            continue
+        if skipping == "fields":
+            if stripped.startswith("- \""):
+                continue
+            skipping = None
+        if _JSON_INSTRUCTION.search(stripped):
+            skipping = "pending"
+            continue
+        if skipping == "pending":
+            if stripped.startswith("{"):
+                skipping = "object"
+                continue
+            skipping = "fields" if stripped.startswith("- \"") else None
+            if skipping:
+                continue
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def chunk_tickers(analysis_data: dict[str, Any], max_tokens: int, overhead_tokens: int = 0) -> list[list[str]]:
+    """Split the tickers, in order, into groups whose estimated prompt and answer tokens fit in max_tokens."""
+    chunks, chunk, chunk_tokens = [], [], overhead_tokens
+    for ticker, data in analysis_data.items():
+        tokens = len(json.dumps(data, separators=(",", ":"))) // CHARS_PER_TOKEN + ANSWER_TOKEN_ESTIMATE
+        if chunk and chunk_tokens + tokens > max_tokens:
+            chunks.append(chunk)
+            chunk, chunk_tokens = [], overhead_tokens
+        chunk.append(ticker)
+        chunk_tokens += tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def generate_persona_signals(
+    agent_name: str,
+    analysis_data: dict[str, Any],
+    build_prompt: Callable[[str, Any], Any],
+    generate_one: Callable[..., T],
+    signal_model: Type[T],
+    model_name: str,
+    model_provider: str,
+    status: str = "Generating LLM output",
+) -> dict[str, T]:
+    """Get the persona's signal for every ticker in analysis_data, in its order.
+
+    `build_prompt(ticker, data)` is the persona's single-ticker prompt, whose system message
+    carries the persona's instructions into the batched prompts, and `generate_one` its
+    single-ticker call, used outside batched mode and as the per-ticker fallback.
+    """
+
+    def generate_each(tickers: list[str]) -> dict[str, T]:
+        outputs = {}
+        for ticker in tickers:
+            progress.update_status(agent_name, ticker, status)
+            outputs[ticker] = generate_one(ticker=ticker, analysis_data=analysis_data[ticker], model_name=model_name, model_provider=model_provider)
+        return outputs
+
+    if not batching_enabled() or len(analysis_data) < 2:
+        return generate_each(list(analysis_data))
+
+    first_ticker = next(iter(analysis_data))
+    persona_message = build_prompt(first_ticker, analysis_data[first_ticker]).to_messages()[0]
+    system_message = SystemMessage(content=f"{strip_output_format(persona_message.content).rstrip()}\n\n{BATCH_FORMAT_NOTE}")
+    template = ChatPromptTemplate.from_messages([system_message, ("human", BATCH_HUMAN_TEMPLATE)])
+    max_tokens = int(os.environ.get("PERSONA_BATCH_MAX_TOKENS") or DEFAULT_MAX_BATCH_TOKENS)
+    overhead_tokens = (len(system_message.content) + len(BATCH_HUMAN_TEMPLATE)) // CHARS_PER_TOKEN
+    chunks = chunk_tickers(analysis_data, max_tokens, overhead_tokens)
+
+    for ticker in analysis_data:
+        progress.update_status(agent_name, ticker, f"{status} (batch of {len(analysis_data)} in {len(chunks)} call(s))")
+    prompts = [template.invoke({"analysis_data": json.dumps({ticker: analysis_data[ticker] for ticker in chunk}, separators=(",", ":")), "tickers": ", ".join(chunk)}) for chunk in chunks]
+    output_model = batch_model(signal_model)
+    answers = _call_batches(prompts, output_model, agent_name, model_name, model_provider)
+
+    # Models sometimes change a ticker's case; anything missing or unparsable is asked for alone
+    signals = {ticker.strip().upper(): signal for answer in answers for ticker, signal in answer.signals.items()}
+    outputs = {ticker: signals[ticker.upper()] for ticker in analysis_data if ticker.upper() in signals}
+    if missing := [ticker for ticker in analysis_data if ticker not in outputs]:
+        print(f"Warning: {agent_name} batched answer has no signal for {', '.join(missing)}; asking for each on its own")
+        outputs.update(generate_each(missing))
+    return {ticker: outputs[ticker] for ticker in analysis_data}
+
+
+def _call_batches(prompts: list, output_model: type[BaseModel], agent_name: str, model_name: str, model_provider: str) -> list[BaseModel]:
+    """Send the batched prompts concurrently (within the provider's limits); a failed call yields no signals."""
+    return run_llm_calls([acall_llm(prompt, model_name, model_provider, output_model, agent_name, default_factory=lambda: output_model(signals={})) for prompt in prompts])
@@ -0,0 +1,15 @@
+from data.cache import add_interval, missing_intervals
+
+
+def test_add_interval_merges_overlapping_and_adjacent_ranges():
+    intervals = add_interval([["2024-01-01", "2024-01-10"]], "2024-01-11", "2024-01-15")
+    intervals = add_interval(intervals, "2024-02-01", "2024-02-05")
+
+    assert intervals == [["2024-01-01", "2024-01-15"], ["2024-02-01", "2024-02-05"]]
+
+
+def test_missing_intervals_returns_the_gaps():
+    intervals = [["2024-01-05", "2024-01-10"], ["2024-01-20", "2024-01-25"]]
+
+    assert missing_intervals(intervals, "2024-01-01", "2024-01-31") == [("2024-01-01", "2024-01-04"), ("2024-01-11", "2024-01-19"), ("2024-01-26", "2024-01-31")]
+    assert missing_intervals(intervals, "2024-01-06", "2024-01-09") == []
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from tools.api import MAX_PAGE_SIZE  # noqa: E402
+from utils.analysts import get_data_plan  # noqa: E402
+
+
+def test_limit_only_readers_fetch_their_newest_rows():
+    plan = get_data_plan(["peter_lynch_agent", "charlie_munger_agent"], "2024-01-01", "2024-06-30")
+
+    assert plan["insider_trades"] == [{"start_date": None, "end_date": "2024-06-30", "limit": 100}]
+    assert plan["company_news"] == [{"start_date": None, "end_date": "2024-06-30", "limit": 100}]
+
+
+def test_lookback_window_is_fetched_before_the_newest_rows():
+    plan = get_data_plan(["michael_burry_agent", "sentiment_analyst_agent"], "2024-01-01", "2024-06-30")
+
+    assert plan["insider_trades"] == [
+        {"start_date": "2023-07-01", "end_date": "2024-06-30", "limit": MAX_PAGE_SIZE},
+        {"start_date": None, "end_date": "2024-06-30", "limit": 1000},
+    ]
+
+
+def test_backtest_fetches_the_rows_after_the_first_end_date():
+    plan = get_data_plan(["phil_fisher_agent"], "2023-12-01", "2024-06-30", first_end_date="2024-01-01")
+
+    assert plan["company_news"] == [
+        {"start_date": "2024-01-02", "end_date": "2024-06-30", "limit": MAX_PAGE_SIZE},
+        {"start_date": None, "end_date": "2024-01-01", "limit": 50},
+    ]
+
+
+def test_unread_endpoints_are_not_fetched():
+    plan = get_data_plan(["technical_analyst_agent"], "2024-01-01", "2024-06-30")
+
+    assert plan["insider_trades"] == plan["company_news"] == []
+    assert plan["prices"] == ("2024-01-01", "2024-06-30")
@@ -0,0 +1,55 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import tools.api as api
+from data.cache import Cache
+
+DAYS = [f"2024-01-{day:02d}" for day in range(1, 11)]
+
+
+class FakeResponse:
+    def __init__(self, data: dict):
+        self.data = data
+
+    def json(self) -> dict:
+        return self.data
+
+
+def trade(day: str) -> dict:
+    return {
+        "ticker": "AAPL", "issuer": "Apple", "name": f"Insider {day}", "title": None, "is_board_director": None,
+        "transaction_date": day, "transaction_shares": 100.0, "transaction_price_per_share": None, "transaction_value": None,
+        "shares_owned_before_transaction": None, "shares_owned_after_transaction": None, "security_title": None, "filing_date": day,
+    }
+
+
+def news(day: str) -> dict:
+    return {"ticker": "AAPL", "title": f"News {day}", "author": "a", "source": "s", "date": day, "url": f"https://example.com/{day}"}
+
+
+@pytest.fixture
+def api_rows(monkeypatch):
+    """Serve one insider trade and one article per day, newest first, from a fresh in-memory cache."""
+    monkeypatch.delenv("FINANCIAL_DATA_CACHE_DIR", raising=False)
+    monkeypatch.setattr(api, "_cache", Cache())
+
+    def fake_request(method, url, ticker, **kwargs):
+        query = {name: values[0] for name, values in parse_qs(urlparse(url).query).items()}
+        start = query.get("filing_date_gte", query.get("start_date", ""))
+        end = query.get("filing_date_lte", query.get("end_date"))
+        days = [day for day in reversed(DAYS) if start <= day <= end][: int(query["limit"])]
+        if "/insider-trades/" in url:
+            return FakeResponse({"insider_trades": [trade(day) for day in days]})
+        return FakeResponse({"news": [news(day) for day in days]})
+
+    monkeypatch.setattr(api, "_request", fake_request)
+
+
+@pytest.mark.parametrize("fetch", [api.get_insider_trades, api.get_company_news])
+def test_repeat_call_served_from_cache_returns_the_same_rows(api_rows, fetch):
+    first = fetch("AAPL", "2024-01-10", start_date="2024-01-02", limit=3)
+    second = fetch("AAPL", "2024-01-10", start_date="2024-01-02", limit=3)
+
+    assert first == second
+    assert len(first) == 3
@@ -0,0 +1,31 @@
+from data.dated_rows import DatedRows
+
+
+def make_rows(rows=None) -> DatedRows:
+    return DatedRows(lambda row: row["date"], lambda row: row["id"], rows)
+
+
+def test_merge_sorts_newest_first_rows_and_skips_repeats():
+    rows = make_rows([{"date": "2024-01-03", "id": 3}, {"date": "2024-01-02", "id": 2}, {"date": "2024-01-01", "id": 1}])
+
+    added = rows.merge([{"date": "2024-01-05", "id": 5}, {"date": "2024-01-02", "id": 2}, {"date": "2024-01-04", "id": 4}, {"date": "2024-01-04", "id": 4}])
+
+    assert added == 2
+    assert rows.dates == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert [row["id"] for row in rows.rows] == [1, 2, 3, 4, 5]
+
+
+def test_merge_keeps_insertion_order_of_rows_sharing_a_date():
+    rows = make_rows([{"date": "2024-01-02", "id": "a"}, {"date": "2024-01-02", "id": "b"}])
+
+    rows.merge([{"date": "2024-01-02", "id": "c"}, {"date": "2024-01-01", "id": "d"}])
+
+    assert [row["id"] for row in rows.rows] == ["d", "a", "b", "c"]
+
+
+def test_window_returns_newest_first_within_dates_and_limit():
+    rows = make_rows([{"date": f"2024-01-{day:02d}", "id": day} for day in range(1, 11)])
+
+    assert [row["id"] for row in rows.window("2024-01-03", "2024-01-06")] == [6, 5, 4, 3]
+    assert [row["id"] for row in rows.window(None, "2024-01-06", limit=2)] == [6, 5]
+    assert rows.window("2024-02-01", "2024-02-05") == []
@@ -0,0 +1,33 @@
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from tools.key_pool import ROUND_ROBIN, APIKeyPool
+
+
+def test_least_loaded_spreads_in_flight_requests():
+    pool = APIKeyPool(["key-a", "key-b"])
+
+    assert {pool.acquire(), pool.acquire()} == {"key-a", "key-b"}
+
+
+def test_round_robin_skips_benched_keys():
+    pool = APIKeyPool(["key-a", "key-b", "key-c"], strategy=ROUND_ROBIN)
+    pool.bench("key-b", 60)
+
+    assert [pool.acquire() for _ in range(4)] == ["key-a", "key-c", "key-a", "key-c"]
+    assert pool.available() == 2
+
+
+def test_exhausted_key_is_benched_until_its_reset():
+    pool = APIKeyPool(["key-a", "key-b"])
+    key = pool.acquire()
+
+    pool.release(key, CaseInsensitiveDict({"X-RateLimit-Remaining": "0", "X-RateLimit-Limit": "100", "X-RateLimit-Reset": "30"}))
+
+    assert pool.available() == 1
+    assert pool.acquire() != key
+
+
+def test_pool_needs_a_key():
+    with pytest.raises(ValueError):
+        APIKeyPool(["", ""])
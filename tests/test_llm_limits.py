@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("rich")
+
+from utils.llm import ProviderLimiter  # noqa: E402
+
+
+class Peak:
+    """Counts the slot holders active at once."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def exit(self):
+        with self._lock:
+            self.active -= 1
+
+
+def test_queued_coroutines_do_not_starve_slot_holders_of_executor_threads():
+    limiter = ProviderLimiter(max_concurrency=4, requests_per_minute=None, tokens_per_minute=None)
+    peak = Peak()
+
+    async def call():
+        async with limiter.aslot(tokens=1):
+            peak.enter()
+            # Slot holders need executor threads too, as LangChain's output parsing does
+            await asyncio.get_running_loop().run_in_executor(None, time.sleep, 0.01)
+            peak.exit()
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=8))
+        await asyncio.wait_for(asyncio.gather(*(call() for _ in range(40))), timeout=5)
+
+    asyncio.run(main())
+
+    assert peak.peak == 4
+
+
+def test_cap_is_shared_by_threads_and_event_loops():
+    limiter = ProviderLimiter(max_concurrency=3, requests_per_minute=None, tokens_per_minute=None)
+    peak = Peak()
+
+    def sync_calls():
+        for _ in range(3):
+            with limiter.slot(tokens=1):
+                peak.enter()
+                time.sleep(0.01)
+                peak.exit()
+
+    async def async_call():
+        async with limiter.aslot(tokens=1):
+            peak.enter()
+            await asyncio.sleep(0.01)
+            peak.exit()
+
+    async def async_calls():
+        await asyncio.gather(*(async_call() for _ in range(5)))
+
+    threads = [threading.Thread(target=sync_calls) for _ in range(3)] + [threading.Thread(target=asyncio.run, args=(async_calls(),)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert peak.peak == 3
+    assert peak.active == 0
+
+
+def test_cancelled_waiter_leaves_no_slot_taken():
+    limiter = ProviderLimiter(max_concurrency=1, requests_per_minute=None, tokens_per_minute=None)
+
+    async def main():
+        async with limiter.aslot(tokens=1):
+            waiter = asyncio.ensure_future(limiter.aslot(tokens=1).__aenter__())
+            await asyncio.sleep(0.02)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+    asyncio.run(main())
+
+    assert limiter._slots.acquire(blocking=False)
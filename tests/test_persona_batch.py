@@ -0,0 +1,82 @@
+import asyncio
+import re
+import threading
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import SystemMessage  # noqa: E402
+from langchain_core.prompts import ChatPromptTemplate  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+from typing_extensions import Literal  # noqa: E402
+
+import utils.llm as llm  # noqa: E402
+from utils.persona_batch import batch_model, generate_persona_signals, strip_output_format  # noqa: E402
+
+SYSTEM_PROMPT = """You are Peter Lynch.
+Favour growth at a reasonable price.
+Return your final output strictly in JSON with the fields:
+{
+  "signal": "bullish" | "bearish" | "neutral",
+  "confidence": 0 to 100,
+  "reasoning": "string"
+}
+Be concise."""
+
+
+class Signal(BaseModel):
+    signal: Literal["bullish", "bearish", "neutral"]
+    confidence: float
+    reasoning: str
+
+
+class FakeChatModel:
+    """Answers batched prompts for every ticker asked about except SKIP, tracking calls in flight."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.threads = set()
+
+    async def ainvoke(self, prompt):
+        self.threads.add(threading.current_thread().name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        tickers = re.search(r"these tickers: (.*?), in the following", prompt.to_messages()[-1].content).group(1).split(", ")
+        return batch_model(Signal)(signals={ticker.lower(): Signal(signal="bullish", confidence=60, reasoning="batched") for ticker in tickers if ticker != "SKIP"})
+
+
+def build_prompt(ticker, analysis_data):
+    return ChatPromptTemplate.from_messages([SystemMessage(content=SYSTEM_PROMPT), ("human", "{ticker}: {analysis_data}")]).invoke({"ticker": ticker, "analysis_data": analysis_data})
+
+
+def test_strip_output_format_drops_the_single_ticker_json_format():
+    stripped = strip_output_format(SYSTEM_PROMPT)
+
+    assert stripped == "You are Peter Lynch.\nFavour growth at a reasonable price.\nBe concise."
+
+
+def test_batches_run_concurrently_through_acall_llm_and_missing_tickers_fall_back(monkeypatch):
+    model = FakeChatModel()
+    monkeypatch.setenv("PERSONA_BATCH", "1")
+    monkeypatch.setenv("PERSONA_BATCH_MAX_TOKENS", "2000")
+    monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+    monkeypatch.setattr(llm, "_get_llm", lambda model_name, model_provider, pydantic_model: (model, False))
+    monkeypatch.setattr(llm, "get_provider_limiter", lambda model_provider: llm.ProviderLimiter(None, None, None))
+    singles = []
+
+    def generate_one(ticker, analysis_data, model_name, model_provider):
+        singles.append(ticker)
+        return Signal(signal="neutral", confidence=0, reasoning="single")
+
+    analysis_data = {ticker: {"score": 5, "details": "x" * 2000} for ticker in ["AAPL", "MSFT", "SKIP", "NVDA", "TSLA", "AMZN"]}
+    outputs = generate_persona_signals("peter_lynch_agent", analysis_data, build_prompt, generate_one, Signal, "test-model", "OpenAI")
+
+    assert list(outputs) == list(analysis_data)
+    assert singles == ["SKIP"]
+    assert outputs["AAPL"].reasoning == "batched"
+    assert model.peak > 1
+    assert model.threads == {"llm-event-loop"}
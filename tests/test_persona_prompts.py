@@ -0,0 +1,66 @@
+"""Persona prompts must only carry the analysis of the ticker being decided, however many were analysed before it."""
+
+import importlib
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+# (agent module, agent function)
+PERSONAS = [
+    ("agents.warren_buffett", "warren_buffett_agent"),
+    ("agents.ben_graham", "ben_graham_agent"),
+    ("agents.bill_ackman", "bill_ackman_agent"),
+    ("agents.cathie_wood", "cathie_wood_agent"),
+    ("agents.charlie_munger", "charlie_munger_agent"),
+    ("agents.michael_burry", "michael_burry_agent"),
+    ("agents.peter_lynch", "peter_lynch_agent"),
+    ("agents.phil_fisher", "phil_fisher_agent"),
+    ("agents.stanley_druckenmiller", "stanley_druckenmiller_agent"),
+]
+
+# Data fetchers the agents import, stubbed to return no data so every ticker's analysis is the same size
+NO_DATA = {
+    "get_financial_metrics": [],
+    "search_line_items": [],
+    "get_market_cap": None,
+    "get_insider_trades": [],
+    "get_company_news": [],
+    "get_prices": [],
+}
+
+TICKERS = [f"T{i:02d}" for i in range(30)]
+
+
+def prompt_lengths(monkeypatch, module_name: str, agent_name: str, tickers: list[str]) -> list[int]:
+    """Run the persona agent over `tickers` and return the length of each prompt it sends, in order."""
+    module = importlib.import_module(module_name)
+    lengths = []
+
+    def fake_call_llm(prompt, default_factory, **kwargs):
+        lengths.append(len(prompt.to_string()))
+        return default_factory()
+
+    monkeypatch.setattr(module, "call_llm", fake_call_llm)
+    for name, value in NO_DATA.items():
+        if hasattr(module, name):
+            monkeypatch.setattr(module, name, lambda *args, value=value, **kwargs: value)
+    state = {
+        "messages": [],
+        "data": {"tickers": tickers, "start_date": "2024-01-01", "end_date": "2024-06-30", "analyst_signals": {}},
+        "metadata": {"show_reasoning": False, "model_name": "test-model", "model_provider": "OpenAI"},
+    }
+    getattr(module, agent_name)(state)
+    return lengths
+
+
+@pytest.mark.parametrize("module_name, agent_name", PERSONAS)
+def test_prompt_size_does_not_grow_with_tickers_analysed(monkeypatch, module_name, agent_name):
+    monkeypatch.delenv("PERSONA_BATCH", raising=False)
+
+    after_one = prompt_lengths(monkeypatch, module_name, agent_name, TICKERS[:1])
+    after_thirty = prompt_lengths(monkeypatch, module_name, agent_name, TICKERS)
+
+    assert len(after_thirty) == len(TICKERS)
+    assert after_thirty[0] == after_one[0]
+    assert after_thirty[-1] == after_one[0]
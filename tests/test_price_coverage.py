@@ -0,0 +1,46 @@
+import datetime
+
+import pytest
+
+import tools.api as api
+from data.cache import Cache
+from data.models import Price
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Serve one bar per requested day from a fresh in-memory cache and record each fetched range."""
+    monkeypatch.delenv("FINANCIAL_DATA_CACHE_DIR", raising=False)
+    monkeypatch.setattr(api, "_cache", Cache())
+    calls = []
+
+    def fake_fetch_prices(ticker, start_date, end_date):
+        calls.append((start_date, end_date))
+        day, end = datetime.date.fromisoformat(start_date), datetime.date.fromisoformat(end_date)
+        prices = []
+        while day <= end:
+            prices.append(Price(open=1.0, close=float(len(calls)), high=1.0, low=1.0, volume=1, time=f"{day.isoformat()}T00:00:00Z"))
+            day += datetime.timedelta(days=1)
+        return prices
+
+    monkeypatch.setattr(api, "_fetch_prices", fake_fetch_prices)
+    return calls
+
+
+def test_past_windows_are_fetched_once(fetches):
+    api.get_prices("AAPL", "2024-01-01", "2024-01-10")
+    api.get_prices("AAPL", "2024-01-03", "2024-01-08")
+
+    assert fetches == [("2024-01-01", "2024-01-10")]
+
+
+def test_today_is_fetched_again_until_the_session_is_over(fetches):
+    today = datetime.date.today()
+    start_date = (today - datetime.timedelta(days=3)).isoformat()
+
+    api.get_prices("AAPL", start_date, today.isoformat())
+    prices = api.get_prices("AAPL", start_date, today.isoformat())
+
+    assert fetches == [(start_date, today.isoformat()), (today.isoformat(), today.isoformat())]
+    # The refetched bar replaces the earlier one
+    assert prices[-1].close == 2.0
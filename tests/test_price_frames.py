@@ -0,0 +1,30 @@
+import pytest
+
+import tools.api as api
+from data.price_store import PriceSeries
+
+PRICES = [{"open": 10.0, "close": 11.0, "high": 12.0, "low": 9.0, "volume": 1000, "time": f"2024-01-0{day}T00:00:00Z"} for day in (2, 3, 4)]
+
+
+@pytest.fixture
+def cached_series(monkeypatch):
+    series = PriceSeries.from_records(PRICES)
+    monkeypatch.setattr(api, "_get_price_series", lambda ticker, start_date, end_date: series)
+    return series
+
+
+def test_prices_df_shares_the_read_only_cache(cached_series):
+    df = api.get_prices_df("AAPL", "2024-01-01", "2024-01-05")
+
+    with pytest.raises(ValueError):
+        df.iloc[0, 0] = 0.0
+
+
+def test_price_data_is_a_writable_copy(cached_series):
+    df = api.get_price_data("AAPL", "2024-01-01", "2024-01-05")
+
+    df.iloc[0, 0] = 0.0
+    df["close"] *= 2
+
+    assert df["close"].tolist() == [22.0, 22.0, 22.0]
+    assert cached_series.ohlc[0].tolist() == [10.0, 11.0, 12.0, 9.0]
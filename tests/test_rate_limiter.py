@@ -0,0 +1,42 @@
+import pytest
+
+from tools.rate_limiter import TokenBucket
+
+
+def test_acquire_spends_the_burst_then_paces_callers():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.1, abs=0.02)
+    assert bucket.stats()["delayed"] == 2
+
+
+def test_reserve_queues_callers_without_sleeping():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    waits = [bucket.reserve() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+    assert bucket.stats()["delayed"] == 2
+
+
+def test_state_file_shares_the_budget_between_buckets(tmp_path):
+    state_path = str(tmp_path / "bucket.state")
+    first, second = TokenBucket(rate=10, burst=1, state_path=state_path), TokenBucket(rate=10, burst=1, state_path=state_path)
+
+    assert first.acquire() == 0.0
+    assert second.acquire() == pytest.approx(0.1, abs=0.02)
+
+
+def test_from_env_is_off_unless_a_rate_is_set(monkeypatch):
+    monkeypatch.delenv("TEST_RATE_LIMIT", raising=False)
+    assert TokenBucket.from_env("TEST_RATE_LIMIT") is None
+
+    monkeypatch.setenv("TEST_RATE_LIMIT", "5")
+    bucket = TokenBucket.from_env("TEST_RATE_LIMIT")
+    assert (bucket.rate, bucket.burst) == (5.0, 5.0)